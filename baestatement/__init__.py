@@ -1,6 +1,15 @@
 from .version import __version__
-from . import pdf
-from . import parse
-from . import stats
-from . import format
-from . import cli
+import importlib
+
+# submodules are imported on first access, so that importing the package
+# doesn't pull in numpy or bs4 for tools that don't need them
+__all__ = ["pdf", "layout", "parse", "table", "stats", "cache", "sync", "record", "verify", "categorize", "search", "db", "synthetic", "bench", "format", "cli"]
+
+def __getattr__(name: str):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__() -> list[str]:
+    return [*globals(), *__all__]
@@ -0,0 +1,122 @@
+from typing import Any, Callable
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from io import StringIO
+import statistics
+import platform
+import time
+
+from .pdf import iter_html_page_fields
+from .parse import parse_statement, extract_statement_lines, combine_statement_lines, infer_statement_line_dates, extract_statement_summary
+from .layout import PageIndex, detect_layout
+from .format.json import format_json, parse_json
+from .synthetic import synthetic_statements, synthetic_page_fields, synthetic_html
+
+# bump whenever the results format changes
+BENCH_VERSION: int = 1
+
+@dataclass
+class Benchmark:
+    name: str
+    # prepares fresh input for every run, setup time is not measured
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+
+@dataclass
+class BenchmarkResult:
+    best: float
+    median: float
+    repeat: int
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1
+
+def run_benchmark(benchmark: Benchmark, repeat: int) -> BenchmarkResult:
+    times: list[float] = []
+    for _ in range(repeat):
+        data = benchmark.setup()
+        start = time.perf_counter()
+        benchmark.run(data)
+        times.append(time.perf_counter() - start)
+
+    return BenchmarkResult(min(times), statistics.median(times), repeat)
+
+def synthetic_benchmarks(years: int, lines_per_statement: int, seed: int = 0) -> list[Benchmark]:
+    from .table import TransactionTable
+    from .stats import analyze, analyze_period, month_of_year, take_date_range
+
+    # every stage runs over the whole synthetic archive, with the output of the previous stages as input
+    stmts = synthetic_statements(years * 12, lines_per_statement, seed)
+    htmls = [synthetic_html(stmt) for stmt in stmts]
+    pages = [synthetic_page_fields(stmt) for stmt in stmts]
+    indices = [[PageIndex(page) for page in stmt_pages] for stmt_pages in pages]
+    layouts = [detect_layout(stmt_indices) for stmt_indices in indices]
+    extracted = [
+        [line for index in stmt_indices[1:] for line in extract_statement_lines(index, layout)]
+        for stmt_indices, layout in zip(indices, layouts)
+    ]
+    dates = [extract_statement_summary(stmt_indices[-1], layout).date for stmt_indices, layout in zip(indices, layouts)]
+    jsons = [format_json(stmt) for stmt in stmts]
+    table = TransactionTable.from_statements(stmts)
+
+    # the middle half of the archive, so that both ends cut through statements
+    first, last = stmts[0].summary.date, stmts[-1].summary.date
+    start_date, end_date = first + (last - first) / 4, last - (last - first) / 4
+
+    const = lambda value: lambda: value
+    return [
+        Benchmark("html_page_fields", const(htmls), lambda htmls: [list(iter_html_page_fields(StringIO(html))) for html in htmls]),
+        Benchmark("page_index", const(pages), lambda pages: [[PageIndex(page) for page in stmt_pages] for stmt_pages in pages]),
+        Benchmark("extract_statement_lines", const(indices), lambda indices: [
+            [extract_statement_lines(index, layout) for index in stmt_indices[1:]]
+            for stmt_indices, layout in zip(indices, layouts)
+        ]),
+        Benchmark("combine_statement_lines", const(extracted), lambda extracted: [combine_statement_lines(lines) for lines in extracted]),
+        # date inference completes the lines in place, so every run gets freshly combined lines
+        Benchmark("infer_statement_line_dates", lambda: [combine_statement_lines(lines) for lines in extracted], lambda combined: [
+            infer_statement_line_dates(lines, date) for lines, date in zip(combined, dates)
+        ]),
+        Benchmark("parse_statement", const(pages), lambda pages: [parse_statement(stmt_pages, strip=False) for stmt_pages in pages]),
+        Benchmark("parse_json", const(jsons), lambda jsons: [parse_json(data) for data in jsons]),
+        Benchmark("transaction_table", const(stmts), TransactionTable.from_statements),
+        # analyses build their indices on first use, so every run gets a fresh table
+        Benchmark("analyze", lambda: TransactionTable(table.statements, table.lines, table.texts), lambda table: analyze(table, difference=True)),
+        Benchmark("analyze_period", lambda: TransactionTable(table.statements, table.lines, table.texts), lambda table: analyze_period(table, month_of_year)),
+        Benchmark("take_date_range", lambda: TransactionTable(table.statements, table.lines, table.texts), lambda table: take_date_range(table, start_date, end_date)),
+    ]
+
+def check_synthetic_statements(years: int, lines_per_statement: int, seed: int = 0):
+    # the generated page fields and json must parse back into the generated statements
+    for stmt in synthetic_statements(years * 12, lines_per_statement, seed):
+        parsed = parse_statement(synthetic_page_fields(stmt), strip=False)
+        assert parsed.lines == stmt.lines and parsed.summary == stmt.summary, f"synthetic statement of {stmt.summary.date:%d.%m.%Y} doesn't parse back"
+        assert parse_json(format_json(stmt)).summary == stmt.summary, f"synthetic statement of {stmt.summary.date:%d.%m.%Y} doesn't round trip through json"
+
+def results_json(results: dict[str, BenchmarkResult], config: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "version": BENCH_VERSION,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": config,
+        "results": { name: asdict(result) for name, result in results.items() },
+    }
+
+def compare_results(current: dict[str, Any], baseline: dict[str, Any]) -> list[Comparison]:
+    # best times are compared, they are the least affected by other load on the machine
+    assert baseline["version"] == BENCH_VERSION, f"unsupported benchmark results version {baseline['version']}"
+    return [
+        Comparison(name, baseline["results"][name]["best"], result["best"])
+        for name, result in current["results"].items()
+        if name in baseline["results"]
+    ]
+
+def regressions(comparisons: list[Comparison], threshold: float) -> list[Comparison]:
+    return [comparison for comparison in comparisons if comparison.change > threshold]
@@ -0,0 +1,105 @@
+from typing import Optional
+from dataclasses import dataclass
+from pathlib import Path
+from itertools import chain
+import hashlib
+import pickle
+import os
+
+from .parse import Statement, PARSER_VERSION
+
+DEFAULT_CACHE_SIZE: int = 256 * 1024 * 1024
+
+def default_cache_dir() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    if not cache_home:
+        cache_home = Path.home() / ".cache"
+
+    return Path(cache_home) / "baestatement"
+
+def write_atomic(path: Path, data: bytes):
+    # write to a temporary file first so concurrent readers never see partial files
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def hash_file(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+@dataclass
+class StatementCache:
+    path: Path
+    max_size: int = DEFAULT_CACHE_SIZE
+
+    def key(self, digest: str, **options) -> str:
+        # options are sorted so that the key doesn't depend on argument order
+        opts = ",".join(f"{k}={v!r}" for k, v in sorted(options.items()))
+        return hashlib.sha256(f"v{PARSER_VERSION}:{digest}:{opts}".encode()).hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.pickle"
+
+    def layout_path(self, digest: str) -> Path:
+        return self.path / "layouts" / f"{digest}.layout"
+
+    def load_layout(self, digest: str) -> Optional[str]:
+        try:
+            return self.layout_path(digest).read_text().strip()
+        except FileNotFoundError:
+            return None
+
+    def store_layout(self, digest: str, layout: str):
+        entry = self.layout_path(digest)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(entry, f"{layout}\n".encode())
+
+    def load(self, key: str) -> Optional[Statement]:
+        entry = self.entry_path(key)
+        try:
+            with open(entry, "rb") as f:
+                stmt = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # corrupt or incompatible entry, drop it and reparse
+            entry.unlink(missing_ok=True)
+            return None
+
+        if not isinstance(stmt, Statement):
+            entry.unlink(missing_ok=True)
+            return None
+
+        # bump mtime so that eviction removes least recently used entries first
+        os.utime(entry)
+        return stmt
+
+    def store(self, key: str, stmt: Statement):
+        entry = self.entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(entry, pickle.dumps(stmt, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def evict(self):
+        # evict once after a batch of stores, scanning the cache directory is expensive
+        entries: list[tuple[float, int, Path]] = []
+        total_size = 0
+        for entry in chain(self.path.glob("*/*.pickle"), self.path.glob("layouts/*.layout")):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append((st.st_mtime, st.st_size, entry))
+            total_size += st.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        # remove oldest entries until the cache fits again
+        for _mtime, size, entry in sorted(entries):
+            if total_size <= self.max_size:
+                break
+
+            entry.unlink(missing_ok=True)
+            total_size -= size
@@ -0,0 +1,129 @@
+from typing import Iterable, Optional, TYPE_CHECKING
+from dataclasses import dataclass, field
+from pathlib import Path
+import re
+
+if TYPE_CHECKING:
+    import numpy as np
+    from .table import TransactionTable
+
+# lines that no rule matches get this category
+UNCATEGORIZED: str = "uncategorized"
+
+@dataclass
+class Rule:
+    category: str
+    # payee, IBAN or any other part of the booking text
+    keyword: str
+
+def normalize_text(text: str) -> str:
+    # booking texts span multiple lines, matching ignores case and line breaks
+    return " ".join(text.casefold().split())
+
+def parse_rules(text: str) -> list[Rule]:
+    # one "category: keyword" rule per line, earlier rules take precedence
+    rules: list[Rule] = []
+    for lineno, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+
+        category, sep, keyword = line.partition(":")
+        category, keyword = category.strip(), keyword.strip()
+        assert sep != "" and category != "" and keyword != "", f"invalid rule on line {lineno}: {line!r}"
+        rules.append(Rule(category, keyword))
+
+    return rules
+
+def load_rules(path: Path) -> list[Rule]:
+    with open(path) as f:
+        return parse_rules(f.read())
+
+def trie_pattern(node: dict) -> str:
+    # keywords are nested by common prefix, so matching at a position follows a single
+    # branch instead of trying every keyword, and "?" prefers the longest keyword
+    branches = [re.escape(c) + trie_pattern(child) for c, child in node.items() if c != ""]
+    if len(branches) == 0:
+        return ""
+    if len(branches) == 1 and "" not in node:
+        return branches[0]
+
+    pattern = "(?:" + "|".join(branches) + ")"
+    return pattern + "?" if "" in node else pattern
+
+def compile_keywords(keywords: Iterable[str]) -> re.Pattern:
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for c in keyword:
+            node = node.setdefault(c, {})
+        node[""] = {}
+
+    # the lookahead matches at every position, so overlapping keywords are all found
+    return re.compile(f"(?=({trie_pattern(trie)}))")
+
+@dataclass
+class Categorizer:
+    rules: list[Rule]
+    # category names indexed by category id, UNCATEGORIZED is always last
+    labels: list[str] = field(init=False)
+    # category id of every rule
+    rule_categories: list[int] = field(init=False)
+    # index of the first rule matching at a position, by longest matched keyword
+    matches: dict[str, int] = field(init=False)
+    pattern: Optional[re.Pattern] = field(init=False)
+    # category ids by normalized text
+    cache: dict[str, int] = field(init=False, default_factory=dict)
+
+    def __post_init__(self):
+        self.labels = [*dict.fromkeys(rule.category for rule in self.rules), UNCATEGORIZED]
+        category_ids = {label: i for i, label in enumerate(self.labels)}
+        self.rule_categories = [category_ids[rule.category] for rule in self.rules]
+
+        # the first rule of a keyword wins
+        keyword_rules: dict[str, int] = {}
+        for i, rule in enumerate(self.rules):
+            keyword_rules.setdefault(normalize_text(rule.keyword), i)
+
+        # only the longest keyword is matched at a position, but every keyword that
+        # is a prefix of it matches there as well, so precompute the best of them
+        self.matches = {}
+        for keyword in keyword_rules:
+            prefixes = (keyword_rules.get(keyword[:i]) for i in range(1, len(keyword) + 1))
+            self.matches[keyword] = min(rule for rule in prefixes if rule is not None)
+
+        self.pattern = compile_keywords(keyword_rules) if keyword_rules else None
+
+    @property
+    def uncategorized(self) -> int:
+        return len(self.labels) - 1
+
+    def categorize(self, text: str) -> int:
+        text = normalize_text(text)
+        category = self.cache.get(text)
+        if category is not None:
+            return category
+
+        category = self.uncategorized
+        if self.pattern is not None:
+            rule = min((self.matches[match.group(1)] for match in self.pattern.finditer(text)), default=None)
+            if rule is not None:
+                category = self.rule_categories[rule]
+
+        self.cache[text] = category
+        return category
+
+    def categorize_texts(self, texts: list[str]) -> "np.ndarray":
+        import numpy as np
+        return np.array([self.categorize(text) for text in texts], dtype="int32")
+
+    def table_categories(self, table: "TransactionTable") -> "np.ndarray":
+        # tables that were built or synced with the same rules already carry the categories
+        if table.categories is not None and table.category_rules == self.rules:
+            return table.categories
+
+        return self.categorize_texts(table.texts)
+
+    def categorize_table(self, table: "TransactionTable") -> "np.ndarray":
+        # line texts are interned, so every distinct text is only categorized once
+        return self.table_categories(table)[table.lines["text"]]
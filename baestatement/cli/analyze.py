@@ -1,47 +1,87 @@
 from argparse import Namespace as Args
 from pathlib import Path
 from glob import glob
-import numpy as np
+from datetime import datetime
+from typing import Optional, TYPE_CHECKING
+import sys
 from baestatement.cli.util import create_default_argparser, add_default_options
-from baestatement.cli.util import find_statement_files, parse_statement_from_path
-from baestatement.stats import analyze, take_date_range
+from baestatement.cli.util import load_statement_table, load_categorizer, require_statements, query_daemon
 from baestatement.format.util import fmt_amount, fmt_date
 
+if TYPE_CHECKING:
+    from baestatement.table import TransactionTable
+    from baestatement.categorize import Categorizer
+
 def parse_args() -> Args:
     ap = create_default_argparser()
-    add_default_options(ap, with_date_options=True, with_positionals=False)
+    add_default_options(ap, with_date_options=True, with_category_options=True, with_positionals=False)
     ap.add_argument("--avg-period", type=int, default=31, help="averaging period (default is 31 days)")
-    ap.add_argument("dir", type=Path, help="path to folder with BankAustria eStatement PDF files")
+    ap.add_argument("dir", type=Path, help="path to folder with BankAustria eStatement PDF files or saved transaction table")
     return ap.parse_args()
 
-def main():
-    args = parse_args()
-    files = find_statement_files(args.dir)
+def format_categories(table: "TransactionTable", categorizer: "Categorizer") -> str:
+    from baestatement.stats import analyze_categories
+
+    stats = analyze_categories(table, categorizer)
+    width = max(len(label) for label in stats.labels)
+
+    formatted = "average per month by category:\n"
+    for label, avg_expenses, avg_income in zip(stats.labels, stats.avg_expenses, stats.avg_income):
+        formatted += f"{label:<{width}} expenses: {fmt_amount(0 - avg_expenses)} income: {fmt_amount(avg_income)}\n"
+    return formatted.rstrip("\n")
+
+def format_analysis(table: "TransactionTable", start_date: Optional[datetime], end_date: Optional[datetime], avg_period: int, categorizer: Optional["Categorizer"] = None) -> str:
+    import numpy as np
+    from baestatement.stats import analyze, take_date_range
 
-    stmts = [parse_statement_from_path(file, args) for file in files]
-    stmts, args.start_date, args.end_date = take_date_range(stmts, args.start_date, args.end_date)
-    stats = analyze(stmts, avg_period=args.avg_period, difference=True)
+    table, start_date, end_date = take_date_range(table, start_date, end_date)
+    stats = analyze(table, avg_period=avg_period, difference=True)
 
-    sum_expenses = sum(stmt.summary.sum_expenses for stmt in stmts)
-    sum_income = sum(stmt.summary.sum_income for stmt in stmts)
+    sum_expenses = table.statements["sum_expenses"].sum() / 100
+    sum_income = table.statements["sum_income"].sum() / 100
+    start_balance = table.statements["old_balance"][0] / 100
+    end_balance = table.statements["new_balance"][-1] / 100
 
-    num_days = (args.end_date - args.start_date).days + 1
-    avg_expenses = sum_expenses / num_days * args.avg_period
-    avg_income = sum_income / num_days * args.avg_period
+    num_days = (end_date - start_date).days + 1
+    avg_expenses = sum_expenses / num_days * avg_period
+    avg_income = sum_income / num_days * avg_period
     avg_difference = np.average(stats.cur_balance)
 
-    print(f"start   date:       {fmt_date(args.start_date)}")
-    print(f"end     date:       {fmt_date(args.end_date)}")
-    print(f"num     days:       {num_days}")
-    print(f"average period:     {args.avg_period}")
-    print(f"start   balance:    {fmt_amount(stmts[0].summary.old_balance)}")
-    print(f"end     balance:    {fmt_amount(stmts[-1].summary.new_balance)}")
-    print(f"balance difference: {fmt_amount(stmts[-1].summary.new_balance - stmts[0].summary.old_balance)}")
-    print(f"sum     expenses:   {fmt_amount(sum_expenses)}")
-    print(f"sum     income:     {fmt_amount(sum_income)}")
-    print(f"average expenses:   {fmt_amount(avg_expenses)}")
-    print(f"average income:     {fmt_amount(avg_income)}")
-    print(f"average difference: {fmt_amount(avg_difference)}")
+    formatted = ""
+    formatted += f"start   date:       {fmt_date(start_date)}\n"
+    formatted += f"end     date:       {fmt_date(end_date)}\n"
+    formatted += f"num     days:       {num_days}\n"
+    formatted += f"average period:     {avg_period}\n"
+    formatted += f"start   balance:    {fmt_amount(start_balance)}\n"
+    formatted += f"end     balance:    {fmt_amount(end_balance)}\n"
+    formatted += f"balance difference: {fmt_amount(end_balance - start_balance)}\n"
+    formatted += f"sum     expenses:   {fmt_amount(sum_expenses)}\n"
+    formatted += f"sum     income:     {fmt_amount(sum_income)}\n"
+    formatted += f"average expenses:   {fmt_amount(avg_expenses)}\n"
+    formatted += f"average income:     {fmt_amount(avg_income)}\n"
+    formatted += f"average difference: {fmt_amount(avg_difference)}\n"
+    if categorizer is not None:
+        formatted += format_categories(table, categorizer) + "\n"
+    return formatted.rstrip("\n")
+
+def main():
+    args = parse_args()
+
+    # answer from a running daemon if there is one, otherwise analyze in-process,
+    # categorization rules are read by the client, so categories are always in-process
+    formatted, failed = None, 0
+    if args.categories is None:
+        formatted = query_daemon("analyze", args.dir, args, start_date=args.start_date, end_date=args.end_date, avg_period=args.avg_period)
+    if formatted is None:
+        # synced archives save the categories with the table, so unchanged archives aren't recategorized
+        categorizer = load_categorizer(args)
+        table, failed = load_statement_table(args.dir, args, categorizer)
+        require_statements(table, args.dir)
+        formatted = format_analysis(table, args.start_date, args.end_date, args.avg_period, categorizer)
+
+    print(formatted)
+    if failed:
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
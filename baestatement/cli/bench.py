@@ -0,0 +1,72 @@
+from argparse import Namespace as Args
+from pathlib import Path
+import json
+import sys
+from baestatement.cli.util import create_default_argparser
+
+def parse_args() -> Args:
+    ap = create_default_argparser(description="benchmark the parser and stats stages on synthetic statements")
+    ap.add_argument("-y", "--years",        type=int,   default=10,     help="number of years of synthetic monthly statements")
+    ap.add_argument("-l", "--lines",        type=int,   default=40,     help="number of lines per synthetic statement")
+    ap.add_argument("-n", "--repeat",       type=int,   default=5,      help="number of timed runs per stage")
+    ap.add_argument("--seed",               type=int,   default=0,      help="random seed of the synthetic statements")
+    ap.add_argument("--stages",             nargs="+",  default=None,   help="only run these stages")
+    ap.add_argument("-o", "--output",       type=Path,  default=None,   help="path to write results JSON to")
+    ap.add_argument("-c", "--compare",      type=Path,  default=None,   help="path to baseline results JSON to compare against")
+    ap.add_argument("-t", "--threshold",    type=float, default=0.2,    help="slowdown relative to the baseline that counts as a regression")
+    ap.add_argument("--json-dir",           type=Path,  default=None,   help="write the synthetic statements as JSON files to this folder instead of benchmarking")
+    return ap.parse_args()
+
+def main():
+    args = parse_args()
+    from baestatement.bench import synthetic_benchmarks, check_synthetic_statements, run_benchmark, results_json, compare_results, regressions
+
+    if args.json_dir is not None:
+        from baestatement.synthetic import synthetic_statements, write_synthetic_json
+        files = write_synthetic_json(synthetic_statements(args.years * 12, args.lines, args.seed), args.json_dir)
+        print(f"info: wrote {len(files)} statements to {str(args.json_dir)!r}", file=sys.stderr)
+        return
+
+    check_synthetic_statements(args.years, args.lines, args.seed)
+    benchmarks = synthetic_benchmarks(args.years, args.lines, args.seed)
+    if args.stages is not None:
+        unknown = set(args.stages) - { benchmark.name for benchmark in benchmarks }
+        if unknown:
+            print(f"error: unknown stages {', '.join(sorted(unknown))}", file=sys.stderr)
+            sys.exit(1)
+        benchmarks = [benchmark for benchmark in benchmarks if benchmark.name in args.stages]
+
+    results = {}
+    print(f"{'stage':<28} {'best':>11} {'median':>11}")
+    for benchmark in benchmarks:
+        result = results[benchmark.name] = run_benchmark(benchmark, args.repeat)
+        print(f"{benchmark.name:<28} {result.best * 1000:8.2f} ms {result.median * 1000:8.2f} ms")
+
+    config = dict(years = args.years, lines = args.lines, seed = args.seed)
+    current = results_json(results, config)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=4)
+
+    if args.compare is None:
+        return
+
+    with open(args.compare, "r") as f:
+        baseline = json.load(f)
+    if baseline["config"] != config:
+        print(f"warning: baseline was measured with {baseline['config']}, not {config}", file=sys.stderr)
+
+    comparisons = compare_results(current, baseline)
+    slow = regressions(comparisons, args.threshold)
+    print()
+    print(f"{'stage':<28} {'baseline':>11} {'current':>11} {'change':>8}")
+    for comparison in comparisons:
+        marker = " regression" if comparison in slow else ""
+        print(f"{comparison.name:<28} {comparison.baseline * 1000:8.2f} ms {comparison.current * 1000:8.2f} ms {comparison.change * 100:+7.1f}%{marker}")
+
+    if slow:
+        print(f"error: {len(slow)} stages are more than {args.threshold * 100:.0f}% slower than the baseline", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,63 @@
 from argparse import Namespace as Args
+from typing import Iterable, TextIO
+from csv import writer as csv_writer
 from pathlib import Path
+import sys
 from baestatement.cli.util import create_default_argparser, add_default_options
-from baestatement.cli.util import parse_statement_from_path
-from baestatement.format import format_csv
+from baestatement.cli.util import find_statement_files, iter_statement_files, take_statement_range, open_output, query_daemon
+from baestatement.parse import Statement
+from baestatement.format.csv import csv_header, csv_rows
 
 def parse_args() -> Args:
     ap = create_default_argparser()
-    add_default_options(ap)
+    add_default_options(ap, with_date_options=True)
     ap.add_argument("-H", "--no-header", action="store_true", default=False, help="don't emit CSV header line")
     ap.add_argument("-o", "--output",    type=Path,           default=None,  help="path to output CSV file")
+    ap.add_argument("-f", "--flush",     action="store_true", default=False, help="flush output after every statement, e.g. when piping into a pager")
     return ap.parse_args()
 
+def write_csv(stmts: Iterable[Statement], f: TextIO, with_header: bool, with_statement: bool, flush: bool = False) -> int:
+    writer = csv_writer(f)
+    if with_header:
+        writer.writerow(csv_header(with_statement))
+
+    count = 0
+    for stmt in stmts:
+        writer.writerows(csv_rows(stmt, with_statement))
+        count += 1
+
+        if flush:
+            f.flush()
+
+    return count
+
 def main():
     args = parse_args()
-    stmt = parse_statement_from_path(args.path, args)
-
-    formatted = format_csv(stmt, with_header = not args.no_header)
-    if args.output is None:
-        print(formatted)
-    else:
-        with open(args.output, "w") as f:
-            f.write(formatted + "\n")
+
+    # rows of combined output get a statement date column to tell statements apart
+    with_header = not args.no_header
+    with_statement = args.path.is_dir()
+
+    # answer from a running daemon if there is one, otherwise parse in-process
+    formatted = query_daemon("csv", args.path, args, with_header = with_header, with_statement = with_statement, start_date = args.start_date, end_date = args.end_date)
+    with open_output(args.output) as f:
+        if formatted is not None:
+            f.write(formatted)
+            return
+
+        files = find_statement_files(args.path)
+        if args.start_date is None and args.end_date is None:
+            stmts = (stmt for _file, stmt in iter_statement_files(files, args))
+            if write_csv(stmts, f, with_header, with_statement, args.flush) != len(files):
+                sys.exit(1)
+            return
+
+        # date ranges cut statements at the range boundaries, which needs all statements at once
+        parsed = [stmt for _file, stmt in iter_statement_files(files, args)]
+        stmts = take_statement_range(parsed, args.start_date, args.end_date)
+        write_csv(stmts, f, with_header, with_statement, args.flush)
+        if len(parsed) != len(files):
+            sys.exit(1)
 
 if __name__ == '__main__':
     main()
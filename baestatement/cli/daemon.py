@@ -0,0 +1,166 @@
+from argparse import Namespace as Args
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional, TYPE_CHECKING
+from io import StringIO
+import asyncio
+import signal
+import json
+import sys
+from baestatement.cli.util import create_default_argparser, add_default_options
+from baestatement.cli.util import sync_statement_archive, parser_options, daemon_socket_path, is_private_dir, take_statement_range
+from baestatement.cli.analyze import format_analysis
+from baestatement.cli.show import write_show, filter_statements
+from baestatement.cli.csv import write_csv
+from baestatement.cli.json import write_json
+from baestatement.parse import Statement
+from baestatement.record import StatementRecord, to_record, from_record, from_records
+from baestatement.sync import load_synced_statements, sync_table_path
+
+if TYPE_CHECKING:
+    from baestatement.table import TransactionTable
+
+def parse_args() -> Args:
+    ap = create_default_argparser()
+    add_default_options(ap, with_positionals=False)
+    ap.add_argument("-i", "--interval", type=float, default=5., help="seconds between checks for new or modified statement files")
+    ap.add_argument("dir", type=Path, help="path to folder with BankAustria eStatement files")
+    return ap.parse_args()
+
+@dataclass
+class Archive:
+    path: Path
+    table: "TransactionTable"
+    # statements by file name, kept as compact records and converted per query
+    statements: dict[str, StatementRecord]
+    # formatted analysis by (start date, end date, averaging period)
+    analyses: dict[tuple, str] = field(default_factory=dict)
+
+    @staticmethod
+    def load(path: Path) -> "Archive":
+        from baestatement.table import TransactionTable
+        table = TransactionTable.load(sync_table_path(path), mmap=False)
+        # build the date index up front so that date range queries are fast from the start
+        table.date_index
+        stmts = load_synced_statements(path)
+        return Archive(path, table, { name: to_record(stmt) for name, stmt in stmts.items() })
+
+    def select(self, path: Path) -> list[Statement]:
+        if path == self.path:
+            return from_records(self.statements[name] for name in sorted(self.statements))
+
+        if path.parent != self.path or path.name not in self.statements:
+            raise ValueError(f"{str(path)!r} is not part of the archive")
+        return [from_record(self.statements[path.name])]
+
+    def analysis(self, start_date: Optional[datetime], end_date: Optional[datetime], avg_period: int) -> str:
+        key = (start_date, end_date, avg_period)
+        if key not in self.analyses:
+            self.analyses[key] = format_analysis(self.table, start_date, end_date, avg_period)
+
+        return self.analyses[key]
+
+class Daemon:
+    def __init__(self, path: Path, args: Args):
+        self.path: Path = path
+        self.args: Args = args
+        self.archive: Archive = Archive.load(path)
+
+    def query(self, request: dict[str, Any]) -> str:
+        if request["options"] != parser_options(self.args):
+            raise ValueError("parser options differ from the daemon's")
+
+        path = Path(request["path"])
+        params = request["params"]
+        for key in ("start_date", "end_date"):
+            if params.get(key) is not None:
+                params[key] = datetime.fromisoformat(params[key])
+
+        archive = self.archive
+        match request["command"]:
+            case "show":
+                f = StringIO()
+                write_show(filter_statements(archive.select(path), params["start_date"], params["end_date"]), f)
+                return f.getvalue()
+            case "analyze":
+                if path != archive.path:
+                    raise ValueError("analysis is only supported for the whole archive")
+                return archive.analysis(params["start_date"], params["end_date"], params["avg_period"])
+            case "csv":
+                f = StringIO(newline="")
+                stmts = take_statement_range(archive.select(path), params["start_date"], params["end_date"])
+                write_csv(stmts, f, params["with_header"], params["with_statement"])
+                return f.getvalue()
+            case "json":
+                f = StringIO()
+                stmts = take_statement_range(archive.select(path), params["start_date"], params["end_date"])
+                write_json(stmts, f, params["as_array"])
+                return f.getvalue()
+            case command:
+                raise ValueError(f"unknown command {command!r}")
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            response = { "output": self.query(json.loads(await reader.readline())) }
+        except Exception as e:
+            response = { "error": f"{type(e).__name__}: {e}" }
+
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    async def watch(self):
+        # poll the directory, parse in a worker thread so queries keep being answered
+        while True:
+            await asyncio.sleep(self.args.interval)
+
+            # keep polling after errors, e.g. files removed while syncing, the next poll retries
+            try:
+                result = await asyncio.to_thread(sync_statement_archive, self.path, self.args)
+                if result.changed():
+                    self.archive = await asyncio.to_thread(Archive.load, self.path)
+                    if self.args.verbose:
+                        print(f"debug: reloaded archive ({len(result.added)} added, {len(result.updated)} updated, {len(result.removed)} removed)", file=sys.stderr)
+            except Exception as e:
+                print(f"error: failed to update archive: {type(e).__name__}: {e}", file=sys.stderr)
+
+async def serve(args: Args):
+    path = args.dir.resolve()
+    sync_statement_archive(path, args)
+    daemon = Daemon(path, args)
+
+    sock_path = daemon_socket_path(path)
+    sock_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if not is_private_dir(sock_path.parent):
+        print(f"error: {str(sock_path.parent)!r} must be a directory owned by the current user with mode 0700", file=sys.stderr)
+        sys.exit(1)
+    sock_path.unlink(missing_ok=True)
+
+    # shut down cleanly on SIGINT and SIGTERM so that the socket is removed
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    server = await asyncio.start_unix_server(daemon.handle_client, path=str(sock_path))
+    watch = asyncio.create_task(daemon.watch())
+    print(f"info: serving {str(path)!r} on {str(sock_path)!r}", file=sys.stderr)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        watch.cancel()
+        sock_path.unlink(missing_ok=True)
+
+def main():
+    args = parse_args()
+    if not args.dir.is_dir():
+        print(f"error: {str(args.dir)!r} is not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    asyncio.run(serve(args))
+
+if __name__ == '__main__':
+    main()
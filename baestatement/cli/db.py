@@ -0,0 +1,48 @@
+from argparse import Namespace as Args
+from contextlib import closing
+from pathlib import Path
+import sqlite3
+import sys
+from baestatement.cli.util import create_default_argparser, add_default_options
+from baestatement.cli.util import find_statement_files, iter_statement_files
+from baestatement.db import connect_db, store_statements
+
+def parse_args() -> Args:
+    ap = create_default_argparser()
+    add_default_options(ap, with_positionals=False)
+    ap.add_argument("-q", "--query", type=str, default=None, help="SQL query to run on the database, rows are printed tab-separated")
+    ap.add_argument("db", type=Path, help="path to SQLite database, created if it doesn't exist")
+    ap.add_argument("path", type=Path, nargs="?", default=None, help="path to BankAustria eStatement file or folder to store in the database")
+    return ap.parse_args()
+
+def fmt_value(value) -> str:
+    return "" if value is None else str(value)
+
+def main():
+    args = parse_args()
+
+    try:
+        conn = connect_db(args.db)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"error: can't open database {str(args.db)!r}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    with closing(conn):
+        # statements are stored as they are parsed, in a single transaction
+        failed = False
+        if args.path is not None:
+            files = find_statement_files(args.path)
+            count = store_statements(conn, (stmt for _file, stmt in iter_statement_files(files, args)))
+            failed = count != len(files)
+            if args.verbose:
+                print(f"debug: stored {count} statements in {str(args.db)!r}", file=sys.stderr)
+
+        if args.query is not None:
+            for row in conn.execute(args.query):
+                print("\t".join(fmt_value(value) for value in row))
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
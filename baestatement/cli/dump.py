@@ -1,18 +1,36 @@
 from argparse import Namespace as Args
+from typing import Iterable, TextIO
+import sys
 from baestatement.cli.util import create_default_argparser, add_default_options
-from baestatement.cli.util import find_statement_files, parse_statement_from_path
-from baestatement.format import format_dump
+from baestatement.cli.util import find_statement_files, iter_statement_files
+from baestatement.parse import Statement
+from baestatement.format import iter_dump
 
 def parse_args() -> Args:
     ap = create_default_argparser()
     add_default_options(ap)
+    ap.add_argument("-f", "--flush", action="store_true", default=False, help="flush output after every statement, e.g. when piping into a pager")
     return ap.parse_args()
 
+def write_dump(stmts: Iterable[Statement], f: TextIO, flush: bool = False) -> int:
+    count = 0
+    for stmt in stmts:
+        f.writelines(iter_dump(stmt))
+        f.write("\n")
+        count += 1
+
+        if flush:
+            f.flush()
+
+    return count
+
 def main():
     args = parse_args()
-    stmt = parse_statement_from_path(args.path, args)
+    files = find_statement_files(args.path)
 
-    print(format_dump(stmt))
+    stmts = (stmt for _file, stmt in iter_statement_files(files, args))
+    if write_dump(stmts, sys.stdout, args.flush) != len(files):
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
@@ -1,18 +1,65 @@
 from argparse import Namespace as Args
+from typing import Iterable, TextIO
+from pathlib import Path
+import sys
 from baestatement.cli.util import create_default_argparser, add_default_options
-from baestatement.cli.util import find_statement_files, parse_statement_from_path
+from baestatement.cli.util import find_statement_files, iter_statement_files, take_statement_range, open_output, query_daemon
+from baestatement.parse import Statement
 from baestatement.format import format_json
 
 def parse_args() -> Args:
     ap = create_default_argparser()
-    add_default_options(ap)
+    add_default_options(ap, with_date_options=True)
+    ap.add_argument("-o", "--output", type=Path, default=None, help="path to output JSON file")
+    ap.add_argument("-f", "--flush",  action="store_true", default=False, help="flush output after every statement, e.g. when piping into a pager")
     return ap.parse_args()
 
+def write_json(stmts: Iterable[Statement], f: TextIO, as_array: bool, flush: bool = False) -> int:
+    # a single statement is written as an object, combined output as an array of objects
+    count = 0
+    if as_array:
+        f.write("[")
+
+    for stmt in stmts:
+        if as_array:
+            f.write("\n" if count == 0 else ",\n")
+            f.write(format_json(stmt))
+        else:
+            f.write(format_json(stmt) + "\n")
+        count += 1
+
+        if flush:
+            f.flush()
+
+    if as_array:
+        f.write("\n]\n")
+
+    return count
+
 def main():
     args = parse_args()
-    stmt = parse_statement_from_path(args.path, args)
+    as_array = args.path.is_dir()
+
+    # answer from a running daemon if there is one, otherwise parse in-process
+    formatted = query_daemon("json", args.path, args, as_array = as_array, start_date = args.start_date, end_date = args.end_date)
+    with open_output(args.output) as f:
+        if formatted is not None:
+            f.write(formatted)
+            return
+
+        files = find_statement_files(args.path)
+        if args.start_date is None and args.end_date is None:
+            stmts = (stmt for _file, stmt in iter_statement_files(files, args))
+            if write_json(stmts, f, as_array, args.flush) != len(files):
+                sys.exit(1)
+            return
 
-    print(format_json(stmt))
+        # date ranges cut statements at the range boundaries, which needs all statements at once
+        parsed = [stmt for _file, stmt in iter_statement_files(files, args)]
+        stmts = take_statement_range(parsed, args.start_date, args.end_date)
+        write_json(stmts, f, as_array, args.flush)
+        if len(parsed) != len(files):
+            sys.exit(1)
 
 if __name__ == '__main__':
     main()
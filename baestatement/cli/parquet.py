@@ -0,0 +1,44 @@
+from argparse import Namespace as Args
+from pathlib import Path
+import sys
+from baestatement.cli.util import create_default_argparser, add_default_options
+from baestatement.cli.util import find_statement_files, iter_statement_files
+from baestatement.format.parquet import import_pyarrow, latest_parquet_statement, write_parquet
+
+def parse_args() -> Args:
+    ap = create_default_argparser()
+    add_default_options(ap)
+    ap.add_argument("-o", "--output", type=Path, required=True, help="path to output Parquet dataset folder, partitioned by year and month")
+    ap.add_argument("-a", "--append", action="store_true", default=False, help="only write statements newer than the latest statement in the dataset")
+    return ap.parse_args()
+
+def main():
+    args = parse_args()
+    try:
+        import_pyarrow()
+    except ImportError as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    after = latest_parquet_statement(args.output) if args.append else None
+    if args.verbose and after is not None:
+        print(f"debug: appending statements after {after:%d.%m.%Y}", file=sys.stderr)
+
+    # statements are written as they are parsed
+    files = find_statement_files(args.path)
+    parsed = 0
+    def stmts():
+        nonlocal parsed
+        for _file, stmt in iter_statement_files(files, args):
+            parsed += 1
+            yield stmt
+
+    count = write_parquet(stmts(), args.output, after)
+    if args.verbose:
+        print(f"debug: wrote {count} statements to {str(args.output)!r}", file=sys.stderr)
+
+    if parsed != len(files):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
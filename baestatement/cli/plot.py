@@ -1,28 +1,31 @@
 from argparse import Namespace as Args
 from pathlib import Path
 from glob import glob
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.ticker import FormatStrFormatter
+import sys
 from baestatement.cli.util import create_default_argparser, add_default_options
-from baestatement.cli.util import find_statement_files, parse_statement_from_path
-from baestatement.stats import analyze, take_date_range
+from baestatement.cli.util import load_statement_table, require_statements
 
 def parse_args() -> Args:
     ap = create_default_argparser()
     add_default_options(ap, with_date_options=True, with_positionals=False)
     ap.add_argument("--avg-period", type=int, default=31, help="averaging period (default is 31 days)")
     ap.add_argument("--difference", action="store_true", default=False, help="plot differences instead of absolute balances")
-    ap.add_argument("dir", type=Path, help="path to folder with BankAustria eStatement PDF files")
+    ap.add_argument("dir", type=Path, help="path to folder with BankAustria eStatement PDF files or saved transaction table")
     return ap.parse_args()
 
 def main():
     args = parse_args()
-    files = find_statement_files(args.dir)
 
-    stmts = [parse_statement_from_path(file, args) for file in files]
-    stmts, args.start_date, args.end_date = take_date_range(stmts, args.start_date, args.end_date)
-    stats = analyze(stmts, avg_period=args.avg_period, difference=args.difference)
+    # plotting dependencies are only imported after argument parsing
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FormatStrFormatter
+    from baestatement.stats import analyze, take_date_range
+
+    table, failed = load_statement_table(args.dir, args)
+    require_statements(table, args.dir)
+    table, args.start_date, args.end_date = take_date_range(table, args.start_date, args.end_date)
+    stats = analyze(table, avg_period=args.avg_period, difference=args.difference)
 
     fig, ax = plt.subplots()
     ax.set_title("Account Balance Difference" if args.difference else "Account Balance")
@@ -34,5 +37,8 @@ def main():
     ax.legend()
     plt.show()
 
+    if failed:
+        sys.exit(1)
+
 if __name__ == '__main__':
     main()
@@ -1,12 +1,9 @@
 from argparse import Namespace as Args
 from pathlib import Path
 from glob import glob
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.ticker import FormatStrFormatter
+import sys
 from baestatement.cli.util import create_default_argparser, add_default_options
-from baestatement.cli.util import find_statement_files, parse_statement_from_path
-from baestatement.stats import analyze_period, analyze_yearly, analyze_monthly, analyze_weekly, take_date_range
+from baestatement.cli.util import load_statement_table, require_statements
 
 def parse_args() -> Args:
     ap = create_default_argparser()
@@ -15,24 +12,30 @@ def parse_args() -> Args:
     ap.add_argument("--monthly", dest="period", action="store_const", const="month", help="plot monthly expenses (default)")
     ap.add_argument("--yearly", dest="period", action="store_const", const="year", help="plot yearly expenses")
     ap.add_argument("--cumulative", action="store_true", default=False, help="plot cumulative expenses")
-    ap.add_argument("dir", type=Path, help="path to folder with BankAustria eStatement PDF files")
+    ap.add_argument("dir", type=Path, help="path to folder with BankAustria eStatement PDF files or saved transaction table")
     return ap.parse_args()
 
 def main():
     args = parse_args()
-    files = find_statement_files(args.dir)
+
+    # plotting dependencies are only imported after argument parsing
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FormatStrFormatter
+    from baestatement.stats import analyze_period, analyze_yearly, analyze_monthly, analyze_weekly, take_date_range
     if args.period is None:
         args.period = "month"
 
-    stmts = [parse_statement_from_path(file, args) for file in files]
-    stmts, args.start_date, args.end_date = take_date_range(stmts, args.start_date, args.end_date)
+    table, failed = load_statement_table(args.dir, args)
+    require_statements(table, args.dir)
+    table, args.start_date, args.end_date = take_date_range(table, args.start_date, args.end_date)
     match args.period:
         case "month":
-            stats = analyze_monthly(stmts, cumulative = args.cumulative)
+            stats = analyze_monthly(table, cumulative = args.cumulative)
         case "week":
-            stats = analyze_weekly(stmts, cumulative = args.cumulative)
+            stats = analyze_weekly(table, cumulative = args.cumulative)
         case "year":
-            stats = analyze_yearly(stmts, cumulative = args.cumulative)
+            stats = analyze_yearly(table, cumulative = args.cumulative)
         case period:
             raise ValueError(f"unknown period '{period}'")
 
@@ -44,5 +47,8 @@ def main():
     ax.legend()
     plt.show()
 
+    if failed:
+        sys.exit(1)
+
 if __name__ == '__main__':
     main()
@@ -3,7 +3,7 @@ from pathlib import Path
 from glob import glob
 import sys
 from baestatement.cli.util import create_default_argparser, add_default_options
-from baestatement.cli.util import find_statement_files, parse_statement_from_path
+from baestatement.cli.util import find_statement_files, parse_statement_files
 
 def parse_args() -> Args:
     ap = create_default_argparser()
@@ -16,7 +16,10 @@ def main():
     files = find_statement_files(args.dir)
 
     error = False
-    stmts = { Path(file): parse_statement_from_path(file, args) for file in files }
+    stmts = parse_statement_files(files, args)
+    if len(stmts) != len(files):
+        error = True
+
     for file, stmt in stmts.items():
         ext = file.name.rsplit(".", 1)[-1]
         expected_name = f"estatement-{stmt.summary.date:%Y-%m-%d}.{ext}"
@@ -0,0 +1,59 @@
+from argparse import Namespace as Args
+from pathlib import Path
+import time
+import sys
+from baestatement.cli.util import create_default_argparser, add_default_options
+from baestatement.cli.util import sync_statement_archive
+from baestatement.parse import to_cents
+from baestatement.format.util import fmt_amount, fmt_date
+
+def parse_args() -> Args:
+    ap = create_default_argparser()
+    add_default_options(ap, with_date_options=True, with_positionals=False)
+    ap.add_argument("--min-amount", type=float, default=None, help="minimum signed amount, e.g. -100 for expenses of up to 100€")
+    ap.add_argument("--max-amount", type=float, default=None, help="maximum signed amount, e.g. -10 for expenses of at least 10€")
+    ap.add_argument("dir", type=Path, help="path to folder with BankAustria eStatement files")
+    ap.add_argument("terms", nargs="*", help="words that lines must contain, a trailing \"*\" matches any word with that prefix")
+    return ap.parse_args()
+
+def main():
+    args = parse_args()
+    if not args.dir.is_dir():
+        print(f"error: {str(args.dir)!r} is not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    from baestatement.search import SearchQuery, tokenize
+    from baestatement.sync import load_synced_index
+
+    # the index lives in the sync store, syncing only parses and reindexes changed files
+    result = sync_statement_archive(args.dir, args)
+    index = load_synced_index(args.dir)
+
+    query = SearchQuery(
+        min_amount = to_cents(args.min_amount),
+        max_amount = to_cents(args.max_amount),
+        start_date = args.start_date,
+        end_date = args.end_date,
+    )
+    for term in args.terms:
+        tokens = tokenize(term)
+        if term.endswith("*") and tokens:
+            query.terms.extend(tokens[:-1])
+            query.prefixes.append(tokens[-1])
+        else:
+            query.terms.extend(tokens)
+
+    start = time.perf_counter()
+    hits = index.search(query)
+    if args.verbose:
+        print(f"debug: found {len(hits)} lines in {(time.perf_counter() - start) * 1000:.2f} ms", file=sys.stderr)
+
+    for hit in hits:
+        text = " ".join(hit.text.split())
+        print(f"{fmt_date(hit.date)} {fmt_amount(hit.amount):>11} {text}")
+
+    if result.failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,52 @@
 from argparse import Namespace as Args
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, TextIO
 from glob import glob
+import sys
 from baestatement.cli.util import create_default_argparser, add_default_options
-from baestatement.cli.util import find_statement_files, parse_statement_from_path
-from baestatement.format import format_cli
+from baestatement.cli.util import find_statement_files, iter_statement_files, query_daemon
+from baestatement.parse import Statement
+from baestatement.format import iter_cli
 
 def parse_args() -> Args:
     ap = create_default_argparser()
-    add_default_options(ap)
+    add_default_options(ap, with_date_options=True)
+    ap.add_argument("-f", "--flush", action="store_true", default=False, help="flush output after every statement, e.g. when piping into a pager")
     return ap.parse_args()
 
+def filter_statements(stmts: Iterable[Statement], start_date: Optional[datetime], end_date: Optional[datetime]) -> Iterator[Statement]:
+    return (
+        stmt for stmt in stmts
+        if (start_date is None or stmt.summary.date >= start_date) and (end_date is None or stmt.summary.date <= end_date)
+    )
+
+def write_show(stmts: Iterable[Statement], f: TextIO, flush: bool = False):
+    for stmt in stmts:
+        f.writelines(iter_cli(stmt))
+        if flush:
+            f.flush()
+
 def main():
     args = parse_args()
-    files = find_statement_files(args.path)
 
-    stmts = [parse_statement_from_path(file, args) for file in files]
-    for stmt in stmts:
-        print(format_cli(stmt))
+    # answer from a running daemon if there is one, otherwise parse in-process
+    formatted = query_daemon("show", args.path, args, start_date=args.start_date, end_date=args.end_date)
+    if formatted is not None:
+        sys.stdout.write(formatted)
+        return
+
+    # statements are counted before filtering, so that parse failures can be told apart
+    parsed = 0
+    def parsed_statements() -> Iterator[Statement]:
+        nonlocal parsed
+        for _file, stmt in iter_statement_files(files, args):
+            parsed += 1
+            yield stmt
+
+    files = find_statement_files(args.path)
+    write_show(filter_statements(parsed_statements(), args.start_date, args.end_date), sys.stdout, args.flush)
+    if parsed != len(files):
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,28 @@
+from argparse import Namespace as Args
+from pathlib import Path
+import sys
+from baestatement.cli.util import create_default_argparser, add_default_options
+from baestatement.cli.util import sync_statement_archive, load_categorizer
+
+def parse_args() -> Args:
+    ap = create_default_argparser()
+    add_default_options(ap, with_category_options=True, with_positionals=False)
+    ap.add_argument("path", type=Path, help="path to folder with BankAustria eStatement files")
+    return ap.parse_args()
+
+def main():
+    args = parse_args()
+    if not args.path.is_dir():
+        print(f"error: {str(args.path)!r} is not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    result = sync_statement_archive(args.path, args, load_categorizer(args))
+    for label, names in (("added", result.added), ("updated", result.updated), ("removed", result.removed)):
+        for name in names:
+            print(f"{label}: {name}")
+
+    if result.failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
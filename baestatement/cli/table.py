@@ -0,0 +1,34 @@
+from argparse import Namespace as Args
+from pathlib import Path
+import sys
+from baestatement.cli.util import create_default_argparser, add_default_options
+from baestatement.cli.util import find_statement_files, parse_statement_files, load_categorizer
+from baestatement.format.jsonl import dump_jsonl
+
+def parse_args() -> Args:
+    ap = create_default_argparser()
+    add_default_options(ap, with_category_options=True)
+    ap.add_argument("-o", "--output", type=Path, required=True, help="path to output transaction table folder, or .jsonl statement archive")
+    return ap.parse_args()
+
+def main():
+    args = parse_args()
+    files = find_statement_files(args.path)
+    stmts = list(parse_statement_files(files, args).values())
+
+    if args.output.name.endswith(".jsonl"):
+        with open(args.output, "wb") as f:
+            dump_jsonl(sorted(stmts, key=lambda stmt: stmt.summary.date), f)
+    else:
+        from baestatement.table import TransactionTable
+        table = TransactionTable.from_statements(stmts)
+        categorizer = load_categorizer(args)
+        if categorizer is not None:
+            table.categorize(categorizer)
+        table.save(args.output)
+
+    if len(stmts) != len(files):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,47 +1,115 @@
 from argparse import ArgumentParser, Namespace as Args, ArgumentDefaultsHelpFormatter
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Iterator, Optional, TextIO, TYPE_CHECKING
+from contextlib import contextmanager, closing
+from collections import deque
+from itertools import islice
 from glob import glob
+import hashlib
+import json
+import stat
+import sys
+import os
 
-from baestatement.pdf import pdf_to_page_fields
+from baestatement.pdf import pdf_to_page_fields, BACKENDS, DEFAULT_BACKEND
 from baestatement.parse import parse_statement, Statement
+from baestatement.layout import LAYOUT_PROFILES
 from baestatement.format.json import parse_json
+from baestatement.format.jsonl import load_jsonl_table
+from baestatement.cache import StatementCache, default_cache_dir, hash_file, DEFAULT_CACHE_SIZE
+from baestatement.db import is_db_path
+from baestatement.sync import SyncResult, sync_archive, sync_table_path, is_synced, load_manifest
+
+# numpy is only needed once statements are turned into tables
+if TYPE_CHECKING:
+    from baestatement.table import TransactionTable
+    from baestatement.categorize import Categorizer
 
 def create_default_argparser(*args, **kwargs) -> ArgumentParser:
     kwargs.setdefault("formatter_class", ArgumentDefaultsHelpFormatter)
     return ArgumentParser(*args, **kwargs)
 
 
-def add_default_options(ap: ArgumentParser, with_date_options: bool = False, with_positionals: bool = True):
+def add_default_options(ap: ArgumentParser, with_date_options: bool = False, with_category_options: bool = False, with_positionals: bool = True):
+    ap.add_argument("-b", "--backend",      choices=BACKENDS,    default=DEFAULT_BACKEND, help="pdf text extraction backend")
     ap.add_argument("-z", "--zoom",         type=float,          default=1.,    help="zoom factor for pdftohtml")
     ap.add_argument("-k", "--keep-tempdir", action="store_true", default=False, help="don't delete temporary directory")
     ap.add_argument("-p", "--precision",    type=int,            default=4,     help="number of digits of coordinate precision")
+    ap.add_argument("-l", "--layout",       choices=["auto", *LAYOUT_PROFILES], default="auto", help="statement layout profile")
     ap.add_argument("-s", "--strip",        action="store_true", default=False, help="remove comments from bank statement")
     ap.add_argument("-v", "--verbose",      action="store_true", default=False, help="print debug info")
+    ap.add_argument("-j", "--jobs",         type=int,            default=os.cpu_count() or 1, help="number of statement files to parse in parallel")
+    ap.add_argument("--no-cache",           action="store_true", default=False, help="don't use the parsed statement cache")
+    ap.add_argument("--cache-dir",          type=Path,           default=default_cache_dir(), help="path to parsed statement cache")
+    ap.add_argument("--cache-size",         type=int,            default=DEFAULT_CACHE_SIZE // 2**20, help="maximum size of parsed statement cache in MiB")
+    ap.add_argument("--no-daemon",          action="store_true", default=False, help="don't query a running bae-daemon, always work in-process")
 
     if with_date_options:
         parse_date = lambda s: datetime.strptime(s, "%Y.%m.%d")
         ap.add_argument("--start-date",     type=parse_date,    default=None,   help="start date of analysis (YYYY.mm.dd)")
         ap.add_argument("--end-date",       type=parse_date,    default=None,   help="end date of analysis (YYYY.mm.dd)")
 
+    if with_category_options:
+        ap.add_argument("-c", "--categories", type=Path,        default=None,   help="categorization rules file with one \"category: keyword\" rule per line")
+
     if with_positionals:
         ap.add_argument("path",             type=Path,                          help="path to BankAustria eStatement file")
 
+def load_categorizer(args: Args) -> Optional["Categorizer"]:
+    if args.categories is None:
+        return None
+
+    from baestatement.categorize import Categorizer, load_rules
+    return Categorizer(load_rules(args.categories))
+
+def open_statement_cache(args: Args) -> Optional[StatementCache]:
+    if args.no_cache:
+        return None
+
+    return StatementCache(args.cache_dir, max_size = args.cache_size * 2**20)
+
 def parse_statement_from_pdf(pdf: Path, args: Args) -> Statement:
+    # look up statement in cache by content hash and parser options
+    cache = open_statement_cache(args)
+    if cache is not None:
+        digest = hash_file(pdf)
+        key = cache.key(digest, backend = args.backend, layout = args.layout, zoom = args.zoom, precision = args.precision, strip = args.strip)
+        stmt = cache.load(key)
+        if stmt is not None:
+            if args.verbose:
+                print(f"debug: using cached statement for {pdf.name!r}", file=sys.stderr)
+            return stmt
+
+    # use the given layout, or the layout previously detected for the same file
+    layout = None
+    if args.layout != "auto":
+        layout = LAYOUT_PROFILES[args.layout]
+    elif cache is not None:
+        layout = LAYOUT_PROFILES.get(cache.load_layout(digest))
+
     # extract page text and coordinates from pdf
     pages = pdf_to_page_fields(
         pdf,
+        backend = args.backend,
         keep_tempdir = args.keep_tempdir,
         zoom = args.zoom,
         precision = args.precision
     )
 
     # parse the statement
-    return parse_statement(
+    stmt = parse_statement(
         pages,
-        strip = args.strip
+        strip = args.strip,
+        layout = layout
     )
 
+    if cache is not None:
+        cache.store(key, stmt)
+        cache.store_layout(digest, stmt.layout)
+
+    return stmt
+
 def parse_statement_from_json(json: Path) -> Statement:
     with open(json, "r") as f:
         return parse_json(f.read())
@@ -59,3 +127,188 @@ def find_statement_files(path: Path) -> list[Path]:
         return [Path(p) for p in sorted(glob(str(path / "*.pdf")) + glob(str(path / "*.json")))]
     else:
         return [path]
+
+def iter_statement_files(files: list[Path], args: Args) -> Iterator[tuple[Path, Statement]]:
+    def report_error(file: Path, e: Exception):
+        print(f"error: failed to parse {file.name!r}: {type(e).__name__}: {e}", file=sys.stderr)
+
+    # parse in-process if there is nothing to parallelize
+    jobs = min(args.jobs, len(files))
+    if jobs <= 1:
+        for file in files:
+            try:
+                stmt = parse_statement_from_path(file, args)
+            except Exception as e:
+                report_error(file, e)
+                continue
+
+            yield file, stmt
+    else:
+        yield from iter_statement_files_parallel(files, args, jobs, report_error)
+
+    # the cache is only trimmed once per batch, not after every stored statement
+    cache = open_statement_cache(args)
+    if cache is not None and any(file.name.endswith(".pdf") for file in files):
+        cache.evict()
+
+def iter_statement_files_parallel(files: list[Path], args: Args, jobs: int, report_error: Callable[[Path, Exception], None]) -> Iterator[tuple[Path, Statement]]:
+    # multiprocessing is slow to import, only pay for it when parsing in parallel
+    from concurrent.futures import ProcessPoolExecutor, Future
+    with ProcessPoolExecutor(max_workers = jobs) as executor:
+        # keep a bounded number of files in flight, so results can be consumed
+        # as they arrive without holding the whole archive in memory
+        pending: deque[tuple[Path, Future]] = deque()
+        remaining = iter(files)
+
+        def submit():
+            for file in islice(remaining, 2 * jobs - len(pending)):
+                pending.append((file, executor.submit(parse_statement_from_path, file, args)))
+
+        # yield results in file order, not completion order
+        submit()
+        while pending:
+            file, future = pending.popleft()
+            submit()
+            try:
+                stmt = future.result()
+            except Exception as e:
+                report_error(file, e)
+                continue
+
+            yield file, stmt
+
+def parse_statement_files(files: list[Path], args: Args) -> dict[Path, Statement]:
+    return dict(iter_statement_files(files, args))
+
+def take_statement_range(stmts: list[Statement], start_date: Optional[datetime], end_date: Optional[datetime]) -> list[Statement]:
+    # statements partially inside the range only keep their transactions inside the range
+    if (start_date is None and end_date is None) or not stmts:
+        return stmts
+
+    from baestatement.stats import take_date_range
+    return take_date_range(stmts, start_date, end_date)[0]
+
+@contextmanager
+def open_output(path: Optional[Path]) -> Iterator[TextIO]:
+    # write to the given file, or to stdout if no file was given
+    if path is None:
+        yield sys.stdout
+        return
+
+    with open(path, "w", newline="") as f:
+        yield f
+
+def parser_options(args: Args) -> dict:
+    return dict(backend = args.backend, layout = args.layout, zoom = args.zoom, precision = args.precision, strip = args.strip)
+
+def sync_statement_archive(path: Path, args: Args, categorizer: Optional["Categorizer"] = None) -> SyncResult:
+    files = find_statement_files(path)
+    return sync_archive(path, files, lambda changed: parse_statement_files(changed, args), parser_options(args), categorizer)
+
+def load_statement_table(path: Path, args: Args, categorizer: Optional["Categorizer"] = None) -> tuple["TransactionTable", int]:
+    from baestatement.table import TransactionTable
+
+    # returns the table and the number of statement files that failed to parse,
+    # load a saved transaction table or statement archive directly, otherwise parse all statement files
+    if path.is_dir() and TransactionTable.exists(path):
+        return TransactionTable.load(path), 0
+
+    if path.name.endswith(".jsonl"):
+        with open(path, "rb") as f:
+            return load_jsonl_table(f), 0
+
+    # databases only load the statements that overlap the requested date range
+    if is_db_path(path):
+        import sqlite3
+        from baestatement.db import connect_db, load_db_table
+        try:
+            conn = connect_db(path, readonly=True)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"error: can't open database {str(path)!r}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        with closing(conn):
+            return load_db_table(conn, getattr(args, "start_date", None), getattr(args, "end_date", None)), 0
+
+    # bring a synced archive up to date, this only parses changed files
+    # archives synced with different parser options are left alone
+    if path.is_dir() and is_synced(path) and load_manifest(path).options == parser_options(args):
+        result = sync_statement_archive(path, args, categorizer)
+        return TransactionTable.load(sync_table_path(path)), len(result.failed)
+
+    files = find_statement_files(path)
+    stmts = parse_statement_files(files, args)
+    return TransactionTable.from_statements(list(stmts.values())), len(files) - len(stmts)
+
+def require_statements(table: "TransactionTable", path: Path):
+    # analyses and plots need at least one statement
+    if len(table) == 0:
+        print(f"error: no statements found in {str(path)!r}", file=sys.stderr)
+        sys.exit(1)
+
+DAEMON_TIMEOUT: float = 10.
+
+def default_socket_dir() -> Path:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        return Path(f"/tmp/baestatement-{os.getuid()}")
+
+    return Path(runtime_dir) / "baestatement"
+
+def is_private_dir(path: Path) -> bool:
+    # the socket directory may be in /tmp, where another user could create it first to
+    # impersonate the daemon or read queries, so it must be a real directory only we can access
+    try:
+        st = path.lstat()
+    except FileNotFoundError:
+        return False
+
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and stat.S_IMODE(st.st_mode) == 0o700
+
+def daemon_socket_path(archive: Path) -> Path:
+    # one daemon per archive, the socket name is derived from the absolute archive path
+    digest = hashlib.sha256(str(archive.resolve()).encode()).hexdigest()
+    return default_socket_dir() / f"{digest[:16]}.sock"
+
+def query_daemon(command: str, path: Path, args: Args, **params) -> Optional[str]:
+    # ask a running daemon for the output of a command, None means fall back to in-process work
+    if args.no_daemon:
+        return None
+
+    archive = path if path.is_dir() else path.parent
+    sock_path = daemon_socket_path(archive)
+    if not sock_path.exists():
+        return None
+
+    if not is_private_dir(sock_path.parent):
+        if args.verbose:
+            print(f"debug: ignoring daemon socket, {str(sock_path.parent)!r} is not a private directory", file=sys.stderr)
+        return None
+
+    import socket
+
+    request = {
+        "command": command,
+        "path": str(path.resolve()),
+        "options": parser_options(args),
+        "params": { k: v.isoformat() if isinstance(v, datetime) else v for k, v in params.items() },
+    }
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(DAEMON_TIMEOUT)
+            sock.connect(str(sock_path))
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                response = json.loads(f.readline())
+    except (OSError, ValueError) as e:
+        if args.verbose:
+            print(f"debug: daemon unavailable, working in-process: {e}", file=sys.stderr)
+        return None
+
+    if "error" in response:
+        if args.verbose:
+            print(f"debug: daemon can't answer query, working in-process: {response['error']}", file=sys.stderr)
+        return None
+
+    return response["output"]
@@ -0,0 +1,33 @@
+from argparse import Namespace as Args
+from pathlib import Path
+import time
+import sys
+from baestatement.cli.util import create_default_argparser, add_default_options
+from baestatement.cli.util import load_statement_table, require_statements
+
+def parse_args() -> Args:
+    ap = create_default_argparser()
+    add_default_options(ap, with_positionals=False)
+    ap.add_argument("dir", type=Path, help="path to folder with BankAustria eStatement files, saved transaction table or statement archive")
+    return ap.parse_args()
+
+def main():
+    args = parse_args()
+    from baestatement.verify import verify_table, format_issue
+
+    table, failed = load_statement_table(args.dir, args)
+    require_statements(table, args.dir)
+
+    start = time.perf_counter()
+    issues = verify_table(table)
+    if args.verbose:
+        print(f"debug: verified {len(table)} statements in {(time.perf_counter() - start) * 1000:.2f} ms", file=sys.stderr)
+
+    for issue in issues:
+        print(f"error: {format_issue(issue)}")
+
+    if issues or failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
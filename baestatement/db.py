@@ -0,0 +1,186 @@
+from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from .parse import Statement, to_cents
+
+if TYPE_CHECKING:
+    import sqlite3
+    from .table import TransactionTable
+
+# bump whenever the database schema changes, stored as the sqlite user_version
+DB_VERSION: int = 1
+
+DB_SUFFIXES: tuple[str, ...] = (".db", ".sqlite", ".sqlite3")
+
+# dates are ISO 8601 strings so that sqlite date functions work on them, amounts
+# are integer cents, statements are keyed by their date
+SCHEMA = """
+CREATE TABLE statements (
+    date                TEXT PRIMARY KEY,
+    sum_expenses        INTEGER NOT NULL,
+    sum_income          INTEGER NOT NULL,
+    old_balance         INTEGER NOT NULL,
+    new_balance         INTEGER NOT NULL,
+    closing_date        TEXT,
+    closing_balance     INTEGER,
+    layout              TEXT,
+    -- value date range of the transactions, for date range queries
+    first_value_date    TEXT,
+    last_value_date     TEXT
+);
+
+CREATE TABLE lines (
+    statement_date      TEXT NOT NULL REFERENCES statements(date) ON DELETE CASCADE,
+    position            INTEGER NOT NULL,
+    text                TEXT NOT NULL,
+    amount              INTEGER,
+    booking_date        TEXT,
+    value_date          TEXT,
+    PRIMARY KEY (statement_date, position)
+);
+
+CREATE INDEX statements_value_dates ON statements(last_value_date, first_value_date);
+CREATE INDEX lines_value_date ON lines(value_date);
+CREATE INDEX lines_amount ON lines(amount);
+"""
+
+# number of statements per executemany batch
+BATCH_SIZE: int = 256
+
+def is_db_path(path: Path) -> bool:
+    return path.name.endswith(DB_SUFFIXES)
+
+def connect_db(path: Path, readonly: bool = False) -> "sqlite3.Connection":
+    # sqlite3 is only imported by tools that actually open a database
+    import sqlite3
+
+    # read-only connections never create the database, missing files fail to open
+    if readonly:
+        conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version == 0 and not readonly:
+        with conn:
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {DB_VERSION}")
+    elif version != DB_VERSION:
+        conn.close()
+        if version == 0:
+            raise ValueError(f"{str(path)!r} is not a statement database")
+        raise ValueError(f"unsupported database version {version}")
+
+    return conn
+
+def to_db_date(date: Optional[datetime]) -> Optional[str]:
+    return None if date is None else date.date().isoformat()
+
+def statement_row(stmt: Statement) -> tuple:
+    summary = stmt.summary
+    value_dates = [line.value_date for line in stmt.lines if line.value_date is not None and line.amount]
+    return (
+        to_db_date(summary.date),
+        to_cents(summary.sum_expenses),
+        to_cents(summary.sum_income),
+        to_cents(summary.old_balance),
+        to_cents(summary.new_balance),
+        to_db_date(summary.closing_date),
+        to_cents(summary.closing_balance),
+        stmt.layout,
+        to_db_date(min(value_dates, default=None)),
+        to_db_date(max(value_dates, default=None)),
+    )
+
+def line_rows(stmt: Statement) -> Iterator[tuple]:
+    date = to_db_date(stmt.summary.date)
+    for i, line in enumerate(stmt.lines):
+        yield (date, i, line.text, to_cents(line.amount), to_db_date(line.booking_date), to_db_date(line.value_date))
+
+def store_statements(conn: "sqlite3.Connection", stmts: Iterable[Statement]) -> int:
+    # statements with the same date replace each other, so storing a directory again is idempotent
+    upsert = """
+        INSERT INTO statements VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(date) DO UPDATE SET
+            sum_expenses = excluded.sum_expenses,
+            sum_income = excluded.sum_income,
+            old_balance = excluded.old_balance,
+            new_balance = excluded.new_balance,
+            closing_date = excluded.closing_date,
+            closing_balance = excluded.closing_balance,
+            layout = excluded.layout,
+            first_value_date = excluded.first_value_date,
+            last_value_date = excluded.last_value_date
+    """
+
+    # everything is stored in a single transaction, in batches of statements
+    count = 0
+    stmts = iter(stmts)
+    with conn:
+        while batch := list(islice(stmts, BATCH_SIZE)):
+            conn.executemany(upsert, (statement_row(stmt) for stmt in batch))
+            conn.executemany("DELETE FROM lines WHERE statement_date = ?", ((to_db_date(stmt.summary.date),) for stmt in batch))
+            conn.executemany("INSERT INTO lines VALUES (?, ?, ?, ?, ?, ?)", (row for stmt in batch for row in line_rows(stmt)))
+            count += len(batch)
+
+    return count
+
+def load_db_table(conn: "sqlite3.Connection", start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> "TransactionTable":
+    import numpy as np
+    from .table import TransactionTable, STATEMENT_DTYPE, LINE_DTYPE, NO_AMOUNT
+
+    # only statements with transactions that can overlap the date range are loaded,
+    # take_date_range slices the statements partially inside the range afterwards
+    conditions, params = ["1"], []
+    if start_date is not None:
+        conditions.append("last_value_date >= ?")
+        params.append(to_db_date(start_date))
+    if end_date is not None:
+        conditions.append("first_value_date <= ?")
+        params.append(to_db_date(end_date))
+    where = " AND ".join(conditions)
+
+    stmt_rows = conn.execute(f"""
+        SELECT date, sum_expenses, sum_income, old_balance, new_balance, closing_date, closing_balance
+        FROM statements WHERE {where} ORDER BY date
+    """, params).fetchall()
+    line_rows = conn.execute(f"""
+        SELECT statement_date, text, amount, booking_date, value_date
+        FROM lines WHERE statement_date IN (SELECT date FROM statements WHERE {where})
+        ORDER BY statement_date, position
+    """, params).fetchall()
+
+    table = TransactionTable(
+        statements = np.zeros(len(stmt_rows), dtype=STATEMENT_DTYPE),
+        lines = np.zeros(len(line_rows), dtype=LINE_DTYPE),
+    )
+
+    or_no_amount = lambda values: [NO_AMOUNT if value is None else value for value in values]
+    if stmt_rows:
+        dates, sum_expenses, sum_income, old_balance, new_balance, closing_date, closing_balance = zip(*stmt_rows)
+        table.statements["date"] = np.array(dates, dtype="datetime64[D]")
+        table.statements["sum_expenses"] = sum_expenses
+        table.statements["sum_income"] = sum_income
+        table.statements["old_balance"] = old_balance
+        table.statements["new_balance"] = new_balance
+        table.statements["closing_date"] = np.array(closing_date, dtype="datetime64[D]")
+        table.statements["closing_balance"] = or_no_amount(closing_balance)
+
+    if line_rows:
+        statement_dates, texts, amounts, booking_dates, value_dates = zip(*line_rows)
+        text_ids: dict[str, int] = {}
+        table.lines["value_date"] = np.array(value_dates, dtype="datetime64[D]")
+        table.lines["booking_date"] = np.array(booking_dates, dtype="datetime64[D]")
+        table.lines["amount"] = or_no_amount(amounts)
+        table.lines["statement"] = np.searchsorted(table.statements["date"], np.array(statement_dates, dtype="datetime64[D]"))
+        table.lines["text"] = [text_ids.setdefault(text, len(text_ids)) for text in texts]
+        table.texts = list(text_ids)
+
+    # lines are ordered by statement, so line ranges follow from the line counts
+    sizes = np.bincount(table.lines["statement"], minlength=len(stmt_rows))
+    table.statements["lines_start"] = np.cumsum(sizes) - sizes
+    table.statements["lines_end"] = np.cumsum(sizes)
+    return table
@@ -1,5 +1,7 @@
 from . import util
-from .cli import format_cli
-from .dump import format_dump
+from .cli import format_cli, iter_cli
+from .dump import format_dump, iter_dump
 from .csv import format_csv
 from .json import format_json
+from .jsonl import dump_jsonl, load_jsonl
+from .parquet import write_parquet
@@ -1,11 +1,10 @@
-from typing import Optional
+from typing import Iterator, Optional
 from datetime import datetime
 from ..parse import Statement
 from .util import fmt_amount, fmt_date, fmt_date_noyear
 
-def format_cli(stmt: Statement) -> str:
-    formatted = ""
-
+def iter_cli(stmt: Statement) -> Iterator[str]:
+    # yields the formatted statement line by line, every line ends with a newline
     for line in stmt.lines:
         text_lines = str(line.text).split("\n")
         for i, text_line in enumerate(text_lines):
@@ -15,11 +14,13 @@ def format_cli(stmt: Statement) -> str:
             if i == len(text_lines) - 1:
                 end_marker = fmt_date_noyear(line.value_date) + " " + fmt_amount(line.amount)
 
-            formatted += f"{begin_marker} {text_line:<57} {end_marker}\n"
+            yield f"{begin_marker} {text_line:<57} {end_marker}\n"
 
-    formatted += f">> date:         {fmt_date(stmt.summary.date)}\n"
+    yield f">> date:         {fmt_date(stmt.summary.date)}\n"
     if stmt.summary.closing_date is not None and stmt.summary.closing_balance is not None:
-        formatted += f"   closing date: {fmt_date(stmt.summary.closing_date)}, closing balance:{fmt_amount(stmt.summary.closing_balance)}\n"
-    formatted += f"   sum expenses:{fmt_amount(stmt.summary.sum_expenses)}, sum income:     {fmt_amount(stmt.summary.sum_income) }\n"
-    formatted += f"   old balance: {fmt_amount(stmt.summary.old_balance )}, new balance:    {fmt_amount(stmt.summary.new_balance)}\n"
-    return formatted.rstrip("\n")
+        yield f"   closing date: {fmt_date(stmt.summary.closing_date)}, closing balance:{fmt_amount(stmt.summary.closing_balance)}\n"
+    yield f"   sum expenses:{fmt_amount(stmt.summary.sum_expenses)}, sum income:     {fmt_amount(stmt.summary.sum_income) }\n"
+    yield f"   old balance: {fmt_amount(stmt.summary.old_balance )}, new balance:    {fmt_amount(stmt.summary.new_balance)}\n"
+
+def format_cli(stmt: Statement) -> str:
+    return "".join(iter_cli(stmt)).rstrip("\n")
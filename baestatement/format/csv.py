@@ -1,21 +1,34 @@
+from typing import Any, Iterator
 from io import StringIO
 from csv import writer as csv_writer
 from ..parse import Statement, StatementLine
 from .util import fmt_date
 
-def format_csv(stmt: Statement, with_header: bool) -> str:
-    f = StringIO("")
+def csv_header(with_statement: bool = False) -> tuple[str, ...]:
+    header = ("text", "booking date", "value date", "amount")
+    if with_statement:
+        header += ("statement date",)
 
-    writer = csv_writer(f)
-    if with_header:
-        writer.writerow(("text", "booking date", "value date", "amount"))
+    return header
 
+def csv_rows(stmt: Statement, with_statement: bool = False) -> Iterator[tuple[Any, ...]]:
+    # the statement date identifies which statement a row came from in combined output
+    statement = (fmt_date(stmt.summary.date),) if with_statement else ()
     for line in stmt.lines:
-        writer.writerow((
+        yield (
             line.text,
             fmt_date(line.booking_date),
             fmt_date(line.value_date),
-            line.amount
-        ))
+            line.amount,
+            *statement
+        )
+
+def format_csv(stmt: Statement, with_header: bool, with_statement: bool = False) -> str:
+    f = StringIO("")
+
+    writer = csv_writer(f)
+    if with_header:
+        writer.writerow(csv_header(with_statement))
 
+    writer.writerows(csv_rows(stmt, with_statement))
     return f.getvalue()
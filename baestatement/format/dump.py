@@ -1,3 +1,4 @@
+from typing import Iterator
 from ..parse import Statement, StatementLine, StatementSummary
 from .util import fmt_amount_repr, fmt_date_repr
 
@@ -25,17 +26,20 @@ def dump_summary(summary: StatementSummary) -> str:
     formatted += "    ),\n"
     return formatted
 
-def dump_statement(stmt: Statement) -> str:
-    formatted = "Statement(\n"
-    formatted += "    lines=[\n"
+def iter_dump(stmt: Statement) -> Iterator[str]:
+    # yields the dumped statement one line or summary at a time, without a final newline
+    yield "Statement(\n"
+    yield "    lines=[\n"
 
     for line in stmt.lines:
-        formatted += dump_line(line)
+        yield dump_line(line)
 
-    formatted += "    ],\n"
-    formatted += dump_summary(stmt.summary)
-    formatted += ")"
-    return formatted
+    yield "    ],\n"
+    yield dump_summary(stmt.summary)
+    yield ")"
+
+def dump_statement(stmt: Statement) -> str:
+    return "".join(iter_dump(stmt))
 
 def format_dump(stmt: Statement) -> str:
     return dump_statement(stmt)
@@ -1,6 +1,6 @@
 from ..parse import Statement, StatementSummary, StatementLine
 from ..parse import IncompleteStatementSummary, IncompleteStatementLine
-from .util import fmt_date
+from .util import fmt_date, json_loads
 from datetime import datetime
 import json
 
@@ -51,7 +51,7 @@ def format_json(stmt: Statement) -> str:
 
 
 def parse_json(s: str) -> Statement:
-    stmt = json.loads(s)
+    stmt = json_loads(s)
 
     return Statement(
         lines = [parse_dict_line(line) for line in stmt["lines"]],
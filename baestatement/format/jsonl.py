@@ -0,0 +1,129 @@
+from typing import Any, BinaryIO, Iterable, Optional, TYPE_CHECKING
+from datetime import datetime
+
+from ..parse import Statement, StatementSummary, StatementLine, to_cents, from_cents
+from .util import json_loads, json_dumps
+
+if TYPE_CHECKING:
+    from ..table import TransactionTable
+
+# bump whenever the archive layout changes
+JSONL_VERSION: int = 1
+JSONL_HEADER: dict[str, Any] = { "format": "baestatement", "version": JSONL_VERSION }
+
+# dates are stored as proleptic gregorian day ordinals, amounts as integer cents
+def to_ordinal(date: Optional[datetime]) -> Optional[int]:
+    return None if date is None else date.toordinal()
+
+def from_ordinal(ordinal: Optional[int]) -> Optional[datetime]:
+    return None if ordinal is None else datetime.fromordinal(ordinal)
+
+# statements are positional arrays so that decoding needs no per-field key lookups:
+# [date, sum_expenses, sum_income, old_balance, new_balance, closing_date, closing_balance, layout, lines]
+# with lines as [text, amount, booking_date, value_date]
+def format_compact(stmt: Statement) -> list:
+    summary = stmt.summary
+    return [
+        to_ordinal(summary.date),
+        to_cents(summary.sum_expenses),
+        to_cents(summary.sum_income),
+        to_cents(summary.old_balance),
+        to_cents(summary.new_balance),
+        to_ordinal(summary.closing_date),
+        to_cents(summary.closing_balance),
+        stmt.layout,
+        [
+            [line.text, to_cents(line.amount), to_ordinal(line.booking_date), to_ordinal(line.value_date)]
+            for line in stmt.lines
+        ],
+    ]
+
+def parse_compact(obj: list, dates: Optional[dict[Optional[int], Optional[datetime]]] = None) -> Statement:
+    # statements share few distinct dates, so decoded dates are memoized across calls
+    if dates is None:
+        dates = {}
+
+    def date_of(ordinal: Optional[int]) -> Optional[datetime]:
+        date = dates.get(ordinal)
+        if date is None and ordinal is not None:
+            date = dates[ordinal] = datetime.fromordinal(ordinal)
+        return date
+
+    date, sum_expenses, sum_income, old_balance, new_balance, closing_date, closing_balance, layout, lines = obj
+    return Statement(
+        lines = [
+            StatementLine(text, None if amount is None else amount / 100, date_of(booking_date), date_of(value_date))
+            for text, amount, booking_date, value_date in lines
+        ],
+        summary = StatementSummary(
+            date = date_of(date),
+            sum_expenses = sum_expenses / 100,
+            sum_income = sum_income / 100,
+            old_balance = old_balance / 100,
+            new_balance = new_balance / 100,
+            closing_date = date_of(closing_date),
+            closing_balance = from_cents(closing_balance),
+        ),
+        layout = layout,
+    )
+
+def dump_jsonl(stmts: Iterable[Statement], f: BinaryIO):
+    f.write(json_dumps(JSONL_HEADER) + b"\n")
+    for stmt in stmts:
+        f.write(json_dumps(format_compact(stmt)) + b"\n")
+
+def parse_jsonl_compact(data: bytes) -> list[list]:
+    header, _, body = data.partition(b"\n")
+    header = json_loads(header)
+    assert header.get("format") == "baestatement", "not a statement archive"
+    assert header.get("version") == JSONL_VERSION, f"unsupported statement archive version {header.get('version')}"
+
+    # decode all statements with a single call instead of one call per line
+    lines = body.split(b"\n")
+    return json_loads(b"[" + b",".join(line for line in lines if line) + b"]")
+
+def parse_jsonl(data: bytes) -> list[Statement]:
+    dates: dict[Optional[int], Optional[datetime]] = {}
+    return [parse_compact(obj, dates) for obj in parse_jsonl_compact(data)]
+
+def parse_jsonl_table(data: bytes) -> "TransactionTable":
+    # ordinals and cents map directly onto table columns, so no statement objects are built
+    import numpy as np
+    from ..table import TransactionTable, STATEMENT_DTYPE, LINE_DTYPE, NO_AMOUNT
+
+    objs = sorted(parse_jsonl_compact(data), key=lambda obj: obj[0])
+    epoch = datetime(1970, 1, 1).toordinal()
+    # NaT has the same bit pattern as the missing amount sentinel
+    to_date64 = lambda ordinals: np.array([NO_AMOUNT if o is None else o - epoch for o in ordinals], dtype="int64").view("datetime64[D]")
+    to_amount = lambda cents: np.array([NO_AMOUNT if c is None else c for c in cents], dtype="int64")
+
+    sizes = np.array([len(obj[8]) for obj in objs], dtype="int64")
+    ends = np.cumsum(sizes)
+    lines = [line for obj in objs for line in obj[8]]
+    text_ids: dict[str, int] = {}
+
+    table = TransactionTable(
+        statements = np.zeros(len(objs), dtype=STATEMENT_DTYPE),
+        lines = np.zeros(len(lines), dtype=LINE_DTYPE),
+    )
+    table.statements["date"] = to_date64([obj[0] for obj in objs])
+    for i, column in enumerate(("sum_expenses", "sum_income", "old_balance", "new_balance")):
+        table.statements[column] = to_amount([obj[1 + i] for obj in objs])
+    table.statements["closing_date"] = to_date64([obj[5] for obj in objs])
+    table.statements["closing_balance"] = to_amount([obj[6] for obj in objs])
+    table.statements["lines_start"] = ends - sizes
+    table.statements["lines_end"] = ends
+
+    table.lines["text"] = [text_ids.setdefault(line[0], len(text_ids)) for line in lines]
+    table.lines["amount"] = to_amount([line[1] for line in lines])
+    table.lines["booking_date"] = to_date64([line[2] for line in lines])
+    table.lines["value_date"] = to_date64([line[3] for line in lines])
+    table.lines["statement"] = np.repeat(np.arange(len(objs), dtype="int32"), sizes)
+    table.texts = list(text_ids)
+    return table
+
+def load_jsonl(f: BinaryIO) -> list[Statement]:
+    return parse_jsonl(f.read())
+
+def load_jsonl_table(f: BinaryIO) -> "TransactionTable":
+    return parse_jsonl_table(f.read())
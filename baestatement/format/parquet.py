@@ -0,0 +1,96 @@
+from typing import Any, Iterable, Iterator, Optional
+from datetime import datetime
+from pathlib import Path
+from glob import glob
+import os
+
+from ..parse import Statement, to_cents
+
+# lines are partitioned by year and month of their value date, every statement
+# gets its own file per partition, so exporting a statement again only replaces
+# its own files and new statements never touch existing files:
+#   <dir>/year=2024/month=03/statement-2024-03-28.parquet
+
+def import_pyarrow() -> tuple[Any, Any]:
+    # pyarrow is optional, it is only needed for parquet export
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("parquet export requires pyarrow, install it with 'pip install baestatement[parquet]'") from None
+
+    return pyarrow, pyarrow.parquet
+
+def parquet_schema() -> Any:
+    pa, _pq = import_pyarrow()
+    return pa.schema([
+        ("statement_date",  pa.date32()),
+        ("line",            pa.int32()),
+        ("text",            pa.string()),
+        ("amount",          pa.decimal128(18, 2)),
+        ("amount_cents",    pa.int64()),
+        ("booking_date",    pa.date32()),
+        ("value_date",      pa.date32()),
+    ])
+
+def parquet_partition(year: int, month: int) -> Path:
+    return Path(f"year={year}") / f"month={month:02}"
+
+def parquet_file_name(stmt: Statement) -> str:
+    return f"statement-{stmt.summary.date:%Y-%m-%d}.parquet"
+
+def statement_batches(stmt: Statement, schema: Any) -> Iterator[tuple[Path, Any]]:
+    from decimal import Decimal
+    pa, _pq = import_pyarrow()
+
+    # lines without value date use their booking date, or the statement date
+    partitions: dict[tuple[int, int], list[int]] = {}
+    for i, line in enumerate(stmt.lines):
+        date = line.value_date or line.booking_date or stmt.summary.date
+        partitions.setdefault((date.year, date.month), []).append(i)
+
+    to_date = lambda date: None if date is None else date.date()
+    for (year, month), ids in partitions.items():
+        lines = [stmt.lines[i] for i in ids]
+        cents = [to_cents(line.amount) for line in lines]
+        yield parquet_partition(year, month), pa.record_batch([
+            [stmt.summary.date.date()] * len(lines),
+            ids,
+            [line.text for line in lines],
+            [None if amount is None else Decimal(amount).scaleb(-2) for amount in cents],
+            cents,
+            [to_date(line.booking_date) for line in lines],
+            [to_date(line.value_date) for line in lines],
+        ], schema=schema)
+
+def latest_parquet_statement(path: Path) -> Optional[datetime]:
+    # the statement date is part of every file name, so no file has to be read
+    dates = [
+        datetime.strptime(Path(name).name, "statement-%Y-%m-%d.parquet")
+        for name in glob(str(path / "year=*" / "month=*" / "statement-*.parquet"))
+    ]
+    return max(dates, default=None)
+
+def write_parquet(stmts: Iterable[Statement], path: Path, after: Optional[datetime] = None) -> int:
+    _pa, pq = import_pyarrow()
+    schema = parquet_schema()
+
+    # statements are written one record batch per partition as they arrive, so
+    # memory use doesn't grow with the number of statements
+    count = 0
+    for stmt in stmts:
+        if after is not None and stmt.summary.date <= after:
+            continue
+
+        for partition, batch in statement_batches(stmt, schema):
+            file = path / partition / parquet_file_name(stmt)
+            file.parent.mkdir(parents=True, exist_ok=True)
+
+            tmp = file.with_name(f"{file.name}.{os.getpid()}.tmp")
+            with pq.ParquetWriter(tmp, schema) as writer:
+                writer.write_batch(batch)
+            os.replace(tmp, file)
+
+        count += 1
+
+    return count
@@ -1,5 +1,24 @@
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime
+import json
+
+# orjson is optional, the stdlib json module produces and reads the same documents
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+def json_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
 
 def fmt_amount(amount: Optional[float]) -> str:
     if amount is None:
@@ -0,0 +1,163 @@
+from typing import Any, TYPE_CHECKING
+from dataclasses import dataclass
+import math
+import re
+
+from .pdf import PageFields
+
+# numpy is only needed for matching fields, so importing layouts stays cheap
+if TYPE_CHECKING:
+    import numpy as np
+
+@dataclass
+class Region:
+    name: str
+    min: tuple[float, float]
+    max: tuple[float, float]
+    # (column end, column name), columns are checked in order with x < column end
+    columns: list[tuple[float, str]]
+
+    def column_ends(self) -> "np.ndarray":
+        import numpy as np
+        return np.array([end for end, _name in self.columns], dtype='float64')
+
+def pixel_region(name: str, page_size: tuple[int, int], min: tuple[int, int], max: tuple[int, int], columns: list[tuple[float, str]]) -> Region:
+    width, height = page_size
+    return Region(
+        name = name,
+        min = (min[0] / width, min[1] / height),
+        max = (max[0] / width, max[1] / height),
+        columns = [(end / width, column) for end, column in columns],
+    )
+
+class PageIndex:
+    def __init__(self, fields: PageFields):
+        import numpy as np
+        n = len(fields)
+        xs = np.fromiter((x for x, _y in fields.keys()), dtype='float64', count=n)
+        ys = np.fromiter((y for _x, y in fields.keys()), dtype='float64', count=n)
+
+        # stable sort by y so fields on the same row keep their document order
+        order = np.argsort(ys, kind='stable')
+        self.order: "np.ndarray" = order
+        self.xs: "np.ndarray" = xs[order]
+        self.ys: "np.ndarray" = ys[order]
+        texts = list(fields.values())
+        self.texts: list[str] = [texts[i] for i in order]
+
+    @staticmethod
+    def of(fields: "PageFields | PageIndex") -> "PageIndex":
+        return fields if isinstance(fields, PageIndex) else PageIndex(fields)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def query(self, region: Region, document_order: bool = False) -> tuple["np.ndarray", "np.ndarray"]:
+        import numpy as np
+
+        # rows are sorted, so the y range is found by binary search
+        lo = np.searchsorted(self.ys, region.min[1], side='left')
+        hi = np.searchsorted(self.ys, region.max[1], side='right')
+        xs = self.xs[lo:hi]
+
+        # bucket fields into columns, fields right of the last column end are dropped
+        idx = np.flatnonzero((xs >= region.min[0]) & (xs <= region.max[0]))
+        cols = np.searchsorted(region.column_ends(), xs[idx], side='right')
+        keep = cols < len(region.columns)
+        idx, cols = idx[keep] + lo, cols[keep]
+
+        if document_order:
+            order = np.argsort(self.order[idx], kind='stable')
+            idx, cols = idx[order], cols[order]
+
+        return idx, cols
+
+# known statement layouts in pdftohtml pixel coordinates at zoom 1, newest first
+LAYOUT_PROFILE_DATA: list[dict[str, Any]] = [
+    {
+        "name": "bankaustria",
+        "version": 1,
+        "page_size": (1782, 864),
+        "regions": {
+            "lines": {
+                "min": (220, 300), "max": (1500, 720),
+                "columns": [(330, "booking_date"), (1200, "text"), (1400, "value_date"), (1500, "amount")],
+            },
+            "summary": {
+                "min": (200, 760), "max": (1500, 800),
+                "columns": [(400, "old_balance"), (900, "sum_expenses"), (1300, "sum_income"), (1500, "new_balance")],
+            },
+            "date": {
+                "min": (900, 160), "max": (1000, 200),
+                "columns": [(math.inf, "date")],
+            },
+        },
+        # (page, region, pattern) of fields that identify this layout
+        "probes": [
+            (-1, "date", r"\s*[0-9]{2}\.[0-9]{2}\.[0-9]{4}"),
+            (-1, "summary", r"\s*[0-9.]+,[0-9]{2}-?\s*$"),
+        ],
+    },
+]
+
+@dataclass
+class Probe:
+    page: int
+    region: Region
+    pattern: re.Pattern
+
+    def matches(self, pages: list[PageIndex]) -> bool:
+        if not -len(pages) <= self.page < len(pages):
+            return False
+
+        index = pages[self.page]
+        idx, _cols = index.query(self.region)
+        return any(self.pattern.match(index.texts[i]) for i in idx.tolist())
+
+@dataclass
+class LayoutProfile:
+    name: str
+    version: int
+    lines: Region
+    summary: Region
+    date: Region
+    probes: list[Probe]
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}-v{self.version}"
+
+    def score(self, pages: list[PageIndex]) -> int:
+        return sum(probe.matches(pages) for probe in self.probes)
+
+def layout_profile(data: dict[str, Any]) -> LayoutProfile:
+    regions = {
+        name: pixel_region(name, data["page_size"], **region)
+        for name, region in data["regions"].items()
+    }
+
+    return LayoutProfile(
+        name = data["name"],
+        version = data["version"],
+        lines = regions["lines"],
+        summary = regions["summary"],
+        date = regions["date"],
+        probes = [Probe(page, regions[region], re.compile(pattern)) for page, region, pattern in data["probes"]],
+    )
+
+LAYOUT_PROFILES: dict[str, LayoutProfile] = {
+    profile.id: profile for profile in map(layout_profile, LAYOUT_PROFILE_DATA)
+}
+DEFAULT_LAYOUT: LayoutProfile = next(iter(LAYOUT_PROFILES.values()))
+
+STATEMENT_LINE_REGION: Region = DEFAULT_LAYOUT.lines
+STATEMENT_SUMMARY_REGION: Region = DEFAULT_LAYOUT.summary
+STATEMENT_DATE_REGION: Region = DEFAULT_LAYOUT.date
+
+def detect_layout(pages: list[PageIndex]) -> LayoutProfile:
+    # pick the profile matching the most probes, ties go to the newer profile
+    profile = max(LAYOUT_PROFILES.values(), key=lambda profile: profile.score(pages))
+    if profile.score(pages) == 0:
+        raise ValueError("statement doesn't match any known layout, pass a layout profile explicitly")
+
+    return profile
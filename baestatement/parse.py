@@ -1,10 +1,16 @@
-from typing import Optional
+from typing import Any, Callable, Optional
 from dataclasses import dataclass, field
-from collections import defaultdict
 from datetime import datetime
 import re
 
-@dataclass
+from .pdf import PageFields
+from .layout import PageIndex, LayoutProfile, DEFAULT_LAYOUT, detect_layout
+from .layout import STATEMENT_LINE_REGION, STATEMENT_SUMMARY_REGION, STATEMENT_DATE_REGION
+
+# bump whenever the parsed output for the same input changes, invalidates cached results
+PARSER_VERSION: int = 3
+
+@dataclass(slots=True)
 class StatementLine:
     text: str
     amount: Optional[float] = None
@@ -26,7 +32,7 @@ class StatementLine:
             self.value_date is None
         )
 
-@dataclass
+@dataclass(slots=True)
 class IncompleteStatementLine:
     text: Optional[str] = None
     amount: Optional[float] = None
@@ -47,7 +53,7 @@ class IncompleteStatementLine:
         assert not isinstance(self.value_date, tuple), f"statement line has no valid value date: {self}"
         return StatementLine(self.text, self.amount, self.booking_date, self.value_date)
 
-@dataclass
+@dataclass(slots=True)
 class StatementSummary:
     date: datetime
     sum_expenses: float
@@ -57,7 +63,7 @@ class StatementSummary:
     closing_date: Optional[datetime] = None
     closing_balance: Optional[float] = None
 
-@dataclass
+@dataclass(slots=True)
 class IncompleteStatementSummary:
     date: Optional[datetime] = None
     sum_expenses: Optional[float] = None
@@ -75,10 +81,11 @@ class IncompleteStatementSummary:
         assert self.new_balance is not None, f"statement summary has no new balance: {self}"
         return StatementSummary(self.date, self.sum_expenses, self.sum_income, self.old_balance, self.new_balance, self.closing_date, self.closing_balance)
 
-@dataclass
+@dataclass(slots=True)
 class Statement:
     lines: list[StatementLine]
     summary: StatementSummary
+    layout: Optional[str] = None
 
 def parse_field_date(field: str) -> Optional[tuple[int, int]]:
     field = field.strip()
@@ -88,75 +95,92 @@ def parse_field_date(field: str) -> Optional[tuple[int, int]]:
     day, month = field.split(".")
     return int(day), int(month)
 
-def parse_field_amount(field: str) -> Optional[float]:
+def parse_field_cents(field: str) -> Optional[int]:
     field = field.strip()
     if field == "":
         return None
 
+    sign = 1
     if field.endswith("-"):
-        field = "-" + field.rstrip("-")
-
-    REPLACEMENTS = { ".": "", ",": "." }
-    field = re.sub("[.,]", lambda match: REPLACEMENTS[match.group()], field)
-    return float(field)
-
-STATEMENT_LINE_AREA_MIN: tuple[float, float] = (220/1782, 300/864)
-STATEMENT_LINE_AREA_MAX: tuple[float, float] = (1500/1782, 720/864)
-STATEMENT_LINE_BOOKING_DATE_END: float  = 330/1782
-STATEMENT_LINE_TEXT_END: float          = 1200/1782
-STATEMENT_LINE_VALUE_DATE_END: float    = 1400/1782
-STATEMENT_LINE_AMOUNT_END: float        = STATEMENT_LINE_AREA_MAX[0]
-def extract_statement_lines(fields: dict[tuple[float, float], str]) -> list[IncompleteStatementLine]:
-    lines: defaultdict[float, IncompleteStatementLine] = defaultdict(IncompleteStatementLine)
-
-    for (x, y), field in fields.items():
-        if (
-            x < STATEMENT_LINE_AREA_MIN[0] or y < STATEMENT_LINE_AREA_MIN[1] or
-            x > STATEMENT_LINE_AREA_MAX[0] or y > STATEMENT_LINE_AREA_MAX[1]
-        ):
-            continue
+        sign = -1
+        field = field.rstrip("-")
 
-        if x < STATEMENT_LINE_BOOKING_DATE_END:
-            lines[y].booking_date = parse_field_date(field)
-        elif x < STATEMENT_LINE_TEXT_END:
-            lines[y].text = field
-        elif x < STATEMENT_LINE_VALUE_DATE_END:
-            lines[y].value_date = parse_field_date(field)
-        elif x < STATEMENT_LINE_AMOUNT_END:
-            lines[y].amount = parse_field_amount(field)
-
-    return [value for _key, value in sorted(lines.items())]
-
-STATEMENT_SUMMARY_AREA_MIN: tuple[float, float] = (200/1782, 760/864)
-STATEMENT_SUMMARY_AREA_MAX: tuple[float, float] = (1500/1782, 800/864)
-STATEMENT_SUMMARY_OLD_BALANCE_END: float    = 400/1782
-STATEMENT_SUMMARY_SUM_EXPENSES_END: float   = 900/1782
-STATEMENT_SUMMARY_SUM_INCOME_END: float     = 1300/1782
-STATEMENT_SUMMARY_NEW_BALANCE_END: float    = STATEMENT_SUMMARY_AREA_MAX[0]
-STATEMENT_DATE_AREA_MIN: tuple[float, float] = (900/1782, 160/864)
-STATEMENT_DATE_AREA_MAX: tuple[float, float] = (1000/1782, 200/864)
-def extract_statement_summary(fields: dict[tuple[float, float], str]) -> IncompleteStatementSummary:
+    # amounts normally have two decimals, so dropping the separators leaves the cents
+    if field[-3:-2] == ",":
+        return sign * int(field.replace(".", "").replace(",", ""))
+
+    units, _, fraction = field.partition(",")
+    assert len(fraction) <= 2, f"amount has more than two decimals: {field!r}"
+    return sign * (int(units.replace(".", "") or "0") * 100 + int(fraction.ljust(2, "0")))
+
+def parse_field_amount(field: str) -> Optional[float]:
+    return from_cents(parse_field_cents(field))
+
+# amounts are parsed from integer cents, so rounding recovers the cents exactly
+def to_cents(amount: Optional[float]) -> Optional[int]:
+    return None if amount is None else round(amount * 100)
+
+def from_cents(cents: Optional[int]) -> Optional[float]:
+    return None if cents is None else cents / 100
+
+def parse_field_statement_date(field: str) -> datetime:
+    field = field.strip().split(" ", 2)[0]
+    return datetime.strptime(field, "%d.%m.%Y")
+
+STATEMENT_LINE_AREA_MIN: tuple[float, float] = STATEMENT_LINE_REGION.min
+STATEMENT_LINE_AREA_MAX: tuple[float, float] = STATEMENT_LINE_REGION.max
+STATEMENT_LINE_BOOKING_DATE_END: float  = STATEMENT_LINE_REGION.columns[0][0]
+STATEMENT_LINE_TEXT_END: float          = STATEMENT_LINE_REGION.columns[1][0]
+STATEMENT_LINE_VALUE_DATE_END: float    = STATEMENT_LINE_REGION.columns[2][0]
+STATEMENT_LINE_AMOUNT_END: float        = STATEMENT_LINE_REGION.columns[3][0]
+STATEMENT_LINE_PARSERS: dict[str, Callable[[str], Any]] = {
+    "booking_date": parse_field_date,
+    "text": lambda field: field,
+    "value_date": parse_field_date,
+    "amount": parse_field_amount,
+}
+def extract_statement_lines(fields: PageFields | PageIndex, layout: LayoutProfile = DEFAULT_LAYOUT) -> list[IncompleteStatementLine]:
+    index = PageIndex.of(fields)
+    region = layout.lines
+    parsers = [(column, STATEMENT_LINE_PARSERS[column]) for _end, column in region.columns]
+
+    # fields are sorted by y, so lines are created in order
+    lines: dict[float, IncompleteStatementLine] = {}
+    idx, cols = index.query(region)
+    for y, i, col in zip(index.ys[idx].tolist(), idx.tolist(), cols.tolist()):
+        line = lines.get(y)
+        if line is None:
+            line = lines[y] = IncompleteStatementLine()
+
+        column, parse = parsers[col]
+        setattr(line, column, parse(index.texts[i]))
+
+    return list(lines.values())
+
+STATEMENT_SUMMARY_AREA_MIN: tuple[float, float] = STATEMENT_SUMMARY_REGION.min
+STATEMENT_SUMMARY_AREA_MAX: tuple[float, float] = STATEMENT_SUMMARY_REGION.max
+STATEMENT_SUMMARY_OLD_BALANCE_END: float    = STATEMENT_SUMMARY_REGION.columns[0][0]
+STATEMENT_SUMMARY_SUM_EXPENSES_END: float   = STATEMENT_SUMMARY_REGION.columns[1][0]
+STATEMENT_SUMMARY_SUM_INCOME_END: float     = STATEMENT_SUMMARY_REGION.columns[2][0]
+STATEMENT_SUMMARY_NEW_BALANCE_END: float    = STATEMENT_SUMMARY_REGION.columns[3][0]
+STATEMENT_DATE_AREA_MIN: tuple[float, float] = STATEMENT_DATE_REGION.min
+STATEMENT_DATE_AREA_MAX: tuple[float, float] = STATEMENT_DATE_REGION.max
+STATEMENT_SUMMARY_PARSERS: dict[str, Callable[[str], Any]] = {
+    "old_balance": parse_field_amount,
+    "sum_expenses": parse_field_amount,
+    "sum_income": parse_field_amount,
+    "new_balance": parse_field_amount,
+    "date": parse_field_statement_date,
+}
+def extract_statement_summary(fields: PageFields | PageIndex, layout: LayoutProfile = DEFAULT_LAYOUT) -> IncompleteStatementSummary:
+    index = PageIndex.of(fields)
     summary = IncompleteStatementSummary()
 
-    for (x, y), field in fields.items():
-        if (
-            x >= STATEMENT_SUMMARY_AREA_MIN[0] and y >= STATEMENT_SUMMARY_AREA_MIN[1] and
-            x <= STATEMENT_SUMMARY_AREA_MAX[0] and y <= STATEMENT_SUMMARY_AREA_MAX[1]
-        ):
-            if x < STATEMENT_SUMMARY_OLD_BALANCE_END:
-                summary.old_balance = parse_field_amount(field)
-            elif x < STATEMENT_SUMMARY_SUM_EXPENSES_END:
-                summary.sum_expenses = parse_field_amount(field)
-            elif x < STATEMENT_SUMMARY_SUM_INCOME_END:
-                summary.sum_income = parse_field_amount(field)
-            elif x < STATEMENT_SUMMARY_NEW_BALANCE_END:
-                summary.new_balance = parse_field_amount(field)
-        elif (
-            x >= STATEMENT_DATE_AREA_MIN[0] and y >= STATEMENT_DATE_AREA_MIN[1] and
-            x <= STATEMENT_DATE_AREA_MAX[0] and y <= STATEMENT_DATE_AREA_MAX[1]
-        ):
-            field = field.strip().split(" ", 2)[0]
-            summary.date = datetime.strptime(field, "%d.%m.%Y")
+    for region in (layout.summary, layout.date):
+        idx, cols = index.query(region, document_order = True)
+        for i, col in zip(idx.tolist(), cols.tolist()):
+            _end, column = region.columns[col]
+            setattr(summary, column, STATEMENT_SUMMARY_PARSERS[column](index.texts[i]))
 
     return summary
 
@@ -252,17 +276,21 @@ def strip_comments(lines: list[StatementLine]) -> list[StatementLine]:
 
     return stripped
 
-def parse_statement(pages: list[dict[tuple[float, float], str]], strip: bool) -> Statement:
+def parse_statement(pages: list[PageFields], strip: bool, layout: Optional[LayoutProfile] = None) -> Statement:
+    indices = [PageIndex(page) for page in pages]
+    if layout is None:
+        layout = detect_layout(indices)
+
     lines: list[IncompleteStatementLine] = []
-    for page in pages[1:]:
-        lines += extract_statement_lines(page)
+    for index in indices[1:]:
+        lines += extract_statement_lines(index, layout)
 
     lines = combine_statement_lines(lines)
-    summary = extract_statement_summary(pages[-1])
+    summary = extract_statement_summary(indices[-1], layout)
     complete_lines = infer_statement_line_dates(lines, summary.date)
     summary.closing_date, summary.closing_balance = infer_closing_booking(complete_lines)
 
     if strip:
         complete_lines = strip_comments(complete_lines)
 
-    return Statement(complete_lines, summary.assert_complete())
+    return Statement(complete_lines, summary.assert_complete(), layout.id)
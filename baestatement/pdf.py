@@ -1,25 +1,39 @@
-from subprocess import check_call, DEVNULL
-from bs4 import BeautifulSoup, Comment, Tag
-from tempfile import TemporaryDirectory
+from typing import Callable, Iterator, Optional, TextIO, TYPE_CHECKING
+from subprocess import check_call, Popen, PIPE, DEVNULL, CalledProcessError
+from html.parser import HTMLParser
+from collections import deque
 from pathlib import Path
+import re
 
-def pdf_to_html(pdf: Path, html: Path, zoom: float = 1):
+# bs4 is only needed by the soup backend, don't import it for the other backends
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, Tag
+
+PageFields = dict[tuple[float, float], str]
+
+def pdftohtml_image_args(images: bool) -> list[str]:
+    # only text is extracted, so images are skipped unless explicitly requested
+    return ["-dataurls"] if images else ["-i"]
+
+def pdf_to_html(pdf: Path, html: Path, zoom: float = 1, images: bool = False):
     assert html.suffix == ".html", "invalid html filename"
-    check_call(["pdftohtml", "-s", "-noframes", "-dataurls", "-zoom", str(zoom), pdf, html.with_suffix("")], stdout=DEVNULL)
+    check_call(["pdftohtml", "-s", "-noframes", *pdftohtml_image_args(images), "-zoom", str(zoom), pdf, html.with_suffix("")], stdout=DEVNULL)
     assert html.exists(), "pdftohtml failed to create html output file"
 
-def pdf_to_soup(pdf: Path, keep_tempdir: bool = True, *args, **kwargs) -> BeautifulSoup:
+def pdf_to_soup(pdf: Path, keep_tempdir: bool = True, zoom: float = 1, images: bool = False, *args, **kwargs) -> "BeautifulSoup":
+    from bs4 import BeautifulSoup
+    from tempfile import TemporaryDirectory
     with TemporaryDirectory(prefix="baestatement.", delete = not keep_tempdir) as tmpdir:
         html = Path(tmpdir) / "index.html"
-        pdf_to_html(pdf, html)
+        pdf_to_html(pdf, html, zoom, images)
 
         with open(html, "r") as f:
             return BeautifulSoup(f.read(), "html.parser")
 
-def extract_pdf_pages(soup: BeautifulSoup) -> list[Tag]:
+def extract_pdf_pages(soup: "BeautifulSoup") -> list["Tag"]:
     return soup.find_all("div", attrs = { "id": lambda cls: cls and cls.startswith("page") })
 
-def extract_tag_css(tag: Tag) -> dict[str, str]:
+def extract_tag_css(tag: "Tag") -> dict[str, str]:
     props: dict[str, str] = {}
     for prop in tag.attrs["style"].split(";"):
         prop = prop.strip()
@@ -31,28 +45,151 @@ def extract_tag_css(tag: Tag) -> dict[str, str]:
 
     return props
 
-def extract_tag_css_size(tag: Tag) -> tuple[int, int]:
+def extract_tag_css_size(tag: "Tag") -> tuple[int, int]:
     css = extract_tag_css(tag)
     return int(css["width"].removesuffix("px")), int(css["height"].removesuffix("px"))
 
-def extract_tag_css_position(tag: Tag) -> tuple[int, int]:
+def extract_tag_css_position(tag: "Tag") -> tuple[int, int]:
     css = extract_tag_css(tag)
     return int(css["left"].removesuffix("px")), int(css["top"].removesuffix("px"))
 
-def extract_page_fields(page: Tag, precision: int = 4, *args, **kwargs) -> dict[tuple[float, float], str]:
+def normalize_field_position(abs_x: int, abs_y: int, width: int, height: int, precision: int) -> tuple[float, float]:
+    x, y = abs_x / width, abs_y / height
+    return round(x, precision), round(y, precision)
+
+def normalize_field_text(text: str) -> str:
+    return text.replace("\xa0", " ")
+
+def extract_page_fields(page: "Tag", precision: int = 4, *args, **kwargs) -> PageFields:
     width, height = extract_tag_css_size(page)
-    fields: dict[tuple[float, float], str] = {}
+    fields: PageFields = {}
 
     for field in page.find_all("p"):
         abs_x, abs_y = extract_tag_css_position(field)
-        x, y = abs_x / width, abs_y / height
-        x, y = round(x, precision), round(y, precision)
-        fields[(x, y)] = field.text.replace("\xa0", " ")
+        fields[normalize_field_position(abs_x, abs_y, width, height, precision)] = normalize_field_text(field.text)
 
     return fields
 
-def pdf_to_page_fields(pdf: Path, *args, **kwargs) -> list[dict[tuple[float, float], str]]:
+def pdf_to_page_fields_soup(pdf: Path, *args, **kwargs) -> list[PageFields]:
     soup = pdf_to_soup(pdf, *args, **kwargs)
     pages = extract_pdf_pages(soup)
 
     return [extract_page_fields(page, *args, **kwargs) for page in pages]
+
+CSS_PROPERTY = re.compile(r"\s*([^:;]+?)\s*:\s*([^;]*?)\s*(?:;|$)")
+def extract_css_props(style: str) -> dict[str, str]:
+    return dict(CSS_PROPERTY.findall(style))
+
+class PageFieldsHTMLParser(HTMLParser):
+    def __init__(self, precision: int = 4):
+        super().__init__(convert_charrefs = True)
+        self.precision = precision
+        self.pages: deque[PageFields] = deque()
+
+        # current page, nesting depth of divs inside it and its size
+        self.fields: Optional[PageFields] = None
+        self.depth = 0
+        self.size = (1, 1)
+
+        # current field position and text chunks
+        self.position: Optional[tuple[int, int]] = None
+        self.text: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]):
+        if tag != "div" and tag != "p":
+            return
+
+        attr = dict(attrs)
+        if self.fields is None:
+            page_id = attr.get("id")
+            if tag == "div" and page_id and page_id.startswith("page"):
+                css = extract_css_props(attr["style"])
+                self.size = int(css["width"].removesuffix("px")), int(css["height"].removesuffix("px"))
+                self.fields = {}
+                self.depth = 0
+        elif tag == "div":
+            self.depth += 1
+        else:
+            css = extract_css_props(attr["style"])
+            self.position = int(css["left"].removesuffix("px")), int(css["top"].removesuffix("px"))
+            self.text = []
+
+    def handle_endtag(self, tag: str):
+        if self.fields is None:
+            return
+
+        if tag == "p" and self.position is not None:
+            abs_x, abs_y = self.position
+            width, height = self.size
+            self.fields[normalize_field_position(abs_x, abs_y, width, height, self.precision)] = normalize_field_text("".join(self.text))
+            self.position = None
+        elif tag == "div" and self.depth > 0:
+            self.depth -= 1
+        elif tag == "div":
+            self.pages.append(self.fields)
+            self.fields = None
+
+    def handle_data(self, data: str):
+        if self.position is not None:
+            self.text.append(data)
+
+def iter_html_page_fields(html: TextIO, precision: int = 4, chunk_size: int = 64 * 1024) -> Iterator[PageFields]:
+    parser = PageFieldsHTMLParser(precision)
+
+    while chunk := html.read(chunk_size):
+        parser.feed(chunk)
+        while parser.pages:
+            yield parser.pages.popleft()
+
+    parser.close()
+    yield from parser.pages
+
+def pdf_to_page_fields_html(pdf: Path, zoom: float = 1, precision: int = 4, images: bool = False, *args, **kwargs) -> list[PageFields]:
+    # stream html from stdout instead of going through a temporary file and a full DOM
+    cmd = ["pdftohtml", "-s", "-noframes", *pdftohtml_image_args(images), "-q", "-stdout", "-zoom", str(zoom), pdf]
+    with Popen(cmd, stdout=PIPE, text=True) as proc:
+        pages = list(iter_html_page_fields(proc.stdout, precision))
+
+    if proc.returncode != 0:
+        raise CalledProcessError(proc.returncode, cmd)
+
+    return pages
+
+def pdf_to_page_fields_xml(pdf: Path, zoom: float = 1, precision: int = 4, *args, **kwargs) -> list[PageFields]:
+    from xml.etree import ElementTree
+    pages: list[PageFields] = []
+    fields: PageFields = {}
+    width, height = 1, 1
+
+    # pdftohtml's xml output has the same text positions as its html output,
+    # but is streamed from stdout without temporary files or embedded images
+    cmd = ["pdftohtml", "-xml", "-i", "-q", "-stdout", "-zoom", str(zoom), pdf]
+    with Popen(cmd, stdout=PIPE) as proc:
+        for event, elem in ElementTree.iterparse(proc.stdout, events=("start", "end")):
+            if event == "start" and elem.tag == "page":
+                width, height = int(elem.attrib["width"]), int(elem.attrib["height"])
+                fields = {}
+            elif event == "end" and elem.tag == "text":
+                abs_x, abs_y = int(elem.attrib["left"]), int(elem.attrib["top"])
+                fields[normalize_field_position(abs_x, abs_y, width, height, precision)] = normalize_field_text("".join(elem.itertext()))
+            elif event == "end" and elem.tag == "page":
+                pages.append(fields)
+                elem.clear()
+
+    if proc.returncode != 0:
+        raise CalledProcessError(proc.returncode, cmd)
+
+    return pages
+
+BACKENDS: dict[str, Callable[..., list[PageFields]]] = {
+    "html": pdf_to_page_fields_html,
+    "soup": pdf_to_page_fields_soup,
+    "xml": pdf_to_page_fields_xml,
+}
+DEFAULT_BACKEND: str = "html"
+
+def pdf_to_page_fields(pdf: Path, backend: str = DEFAULT_BACKEND, *args, **kwargs) -> list[PageFields]:
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown pdf backend '{backend}'")
+
+    return BACKENDS[backend](pdf, *args, **kwargs)
@@ -0,0 +1,91 @@
+from typing import Iterable, Optional
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from .parse import Statement, StatementLine, StatementSummary, to_cents, from_cents
+
+# immutable, slotted statements for keeping large archives in memory, dates are
+# plain dates and amounts are integer cents, convert with to_record/from_record
+
+@dataclass(slots=True, frozen=True)
+class StatementLineRecord:
+    text: str
+    amount: Optional[int] = None
+    booking_date: Optional[date] = None
+    value_date: Optional[date] = None
+
+@dataclass(slots=True, frozen=True)
+class StatementSummaryRecord:
+    date: date
+    sum_expenses: int
+    sum_income: int
+    old_balance: int
+    new_balance: int
+    closing_date: Optional[date] = None
+    closing_balance: Optional[int] = None
+
+@dataclass(slots=True, frozen=True)
+class StatementRecord:
+    lines: tuple[StatementLineRecord, ...]
+    summary: StatementSummaryRecord
+    layout: Optional[str] = None
+
+def to_record_date(value: Optional[datetime]) -> Optional[date]:
+    return None if value is None else value.date()
+
+def from_record_date(value: Optional[date]) -> Optional[datetime]:
+    return None if value is None else datetime(value.year, value.month, value.day)
+
+def to_record(stmt: Statement) -> StatementRecord:
+    summary = stmt.summary
+    return StatementRecord(
+        lines = tuple(
+            StatementLineRecord(
+                line.text,
+                to_cents(line.amount),
+                to_record_date(line.booking_date),
+                to_record_date(line.value_date),
+            )
+            for line in stmt.lines
+        ),
+        summary = StatementSummaryRecord(
+            date = summary.date.date(),
+            sum_expenses = to_cents(summary.sum_expenses),
+            sum_income = to_cents(summary.sum_income),
+            old_balance = to_cents(summary.old_balance),
+            new_balance = to_cents(summary.new_balance),
+            closing_date = to_record_date(summary.closing_date),
+            closing_balance = to_cents(summary.closing_balance),
+        ),
+        layout = stmt.layout,
+    )
+
+def from_record(record: StatementRecord) -> Statement:
+    summary = record.summary
+    return Statement(
+        lines = [
+            StatementLine(
+                line.text,
+                from_cents(line.amount),
+                from_record_date(line.booking_date),
+                from_record_date(line.value_date),
+            )
+            for line in record.lines
+        ],
+        summary = StatementSummary(
+            date = from_record_date(summary.date),
+            sum_expenses = from_cents(summary.sum_expenses),
+            sum_income = from_cents(summary.sum_income),
+            old_balance = from_cents(summary.old_balance),
+            new_balance = from_cents(summary.new_balance),
+            closing_date = from_record_date(summary.closing_date),
+            closing_balance = from_cents(summary.closing_balance),
+        ),
+        layout = record.layout,
+    )
+
+def to_records(stmts: Iterable[Statement]) -> list[StatementRecord]:
+    return [to_record(stmt) for stmt in stmts]
+
+def from_records(records: Iterable[StatementRecord]) -> list[Statement]:
+    return [from_record(record) for record in records]
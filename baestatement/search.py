@@ -0,0 +1,166 @@
+from typing import Iterable, Optional
+from dataclasses import dataclass, field
+from datetime import datetime
+from bisect import bisect_left
+from pathlib import Path
+import pickle
+import re
+
+from .parse import Statement, to_cents, from_cents
+
+# bump whenever the on-disk index format changes
+INDEX_VERSION: int = 1
+
+TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.casefold())
+
+@dataclass
+class IndexSegment:
+    # one segment per statement file, so that updating a file only replaces its segment
+    statement_date: int
+    first_date: int
+    last_date: int
+    # date ordinals and amounts in cents of the lines of the statement, lines without
+    # a value or booking date use the statement date
+    dates: list[int]
+    amounts: list[Optional[int]]
+    texts: list[str]
+    # line numbers by token, and all tokens sorted for prefix queries
+    postings: dict[str, list[int]]
+    tokens: list[str]
+
+def index_statement(stmt: Statement) -> IndexSegment:
+    statement_date = stmt.summary.date.toordinal()
+    dates: list[int] = []
+    amounts: list[Optional[int]] = []
+    texts: list[str] = []
+    postings: dict[str, list[int]] = {}
+
+    for i, line in enumerate(stmt.lines):
+        date = line.value_date or line.booking_date
+        dates.append(statement_date if date is None else date.toordinal())
+        amounts.append(to_cents(line.amount))
+        texts.append(line.text)
+        for token in dict.fromkeys(tokenize(line.text)):
+            postings.setdefault(token, []).append(i)
+
+    return IndexSegment(
+        statement_date = statement_date,
+        first_date = min(dates, default=statement_date),
+        last_date = max(dates, default=statement_date),
+        dates = dates,
+        amounts = amounts,
+        texts = texts,
+        postings = postings,
+        tokens = sorted(postings),
+    )
+
+@dataclass
+class SearchQuery:
+    # all terms and prefixes must match tokens of a line
+    terms: list[str] = field(default_factory=list)
+    prefixes: list[str] = field(default_factory=list)
+    # inclusive ranges, amounts in cents
+    min_amount: Optional[int] = None
+    max_amount: Optional[int] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+@dataclass
+class SearchHit:
+    file: str
+    line: int
+    date: datetime
+    amount: Optional[float]
+    text: str
+
+def prefix_lines(segment: IndexSegment, prefix: str) -> set[int]:
+    lines: set[int] = set()
+    i = bisect_left(segment.tokens, prefix)
+    while i < len(segment.tokens) and segment.tokens[i].startswith(prefix):
+        lines.update(segment.postings[segment.tokens[i]])
+        i += 1
+
+    return lines
+
+def match_segment(segment: IndexSegment, query: SearchQuery, start: int, end: int) -> Iterable[int]:
+    # intersect postings first, so that only candidate lines are checked against the ranges
+    candidates: Optional[set[int]] = None
+    for term in query.terms:
+        lines = set(segment.postings.get(term, ()))
+        candidates = lines if candidates is None else candidates & lines
+    for prefix in query.prefixes:
+        lines = prefix_lines(segment, prefix)
+        candidates = lines if candidates is None else candidates & lines
+
+    has_amount_range = query.min_amount is not None or query.max_amount is not None
+    for i in (range(len(segment.texts)) if candidates is None else sorted(candidates)):
+        if not start <= segment.dates[i] <= end:
+            continue
+
+        amount = segment.amounts[i]
+        if has_amount_range:
+            if amount is None:
+                continue
+            if query.min_amount is not None and amount < query.min_amount:
+                continue
+            if query.max_amount is not None and amount > query.max_amount:
+                continue
+
+        yield i
+
+@dataclass
+class SearchIndex:
+    version: int = INDEX_VERSION
+    segments: dict[str, IndexSegment] = field(default_factory=dict)
+
+    def update(self, name: str, stmt: Statement):
+        self.segments[name] = index_statement(stmt)
+
+    def remove(self, name: str):
+        self.segments.pop(name, None)
+
+    def search(self, query: SearchQuery) -> list[SearchHit]:
+        start = 1 if query.start_date is None else query.start_date.toordinal()
+        end = datetime.max.toordinal() if query.end_date is None else query.end_date.toordinal()
+
+        hits: list[SearchHit] = []
+        for name, segment in self.segments.items():
+            # skip statements outside of the date range without looking at their lines
+            if segment.last_date < start or segment.first_date > end:
+                continue
+
+            for i in match_segment(segment, query, start, end):
+                amount = segment.amounts[i]
+                hits.append(SearchHit(
+                    file = name,
+                    line = i,
+                    date = datetime.fromordinal(segment.dates[i]),
+                    amount = from_cents(amount),
+                    text = segment.texts[i],
+                ))
+
+        hits.sort(key=lambda hit: (hit.date, hit.file, hit.line))
+        return hits
+
+def build_search_index(stmts: dict[str, Statement]) -> SearchIndex:
+    index = SearchIndex()
+    for name, stmt in stmts.items():
+        index.update(name, stmt)
+
+    return index
+
+def load_search_index(path: Path) -> Optional[SearchIndex]:
+    # missing or outdated indices are rebuilt from the stored statements
+    try:
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+    if not isinstance(index, SearchIndex) or index.version != INDEX_VERSION:
+        return None
+
+    return index
@@ -1,13 +1,14 @@
 from typing import Callable, Optional
 from dataclasses import dataclass, field
-from datetime import timedelta, datetime
-from collections import deque
-import itertools
+from datetime import datetime
 import calendar
 import numpy as np
 import numpy.typing as npt
+from numpy.lib.stride_tricks import sliding_window_view
 
-from .parse import Statement, StatementLine, IncompleteStatementSummary
+from .parse import Statement
+from .categorize import Categorizer
+from .table import TransactionTable, NO_AMOUNT, pack_date_keys, to_date64, from_date64
 
 @dataclass
 class StatementStats:
@@ -20,132 +21,124 @@ class StatementStats:
 def sort(statements: list[Statement]) -> list[Statement]:
     return list(sorted(statements, key=lambda stmt: stmt.summary.date))
 
-def take_date_range(statements: list[Statement], start_date: Optional[datetime], end_date: Optional[datetime]) -> tuple[list[Statement], datetime, datetime]:
+def as_table(statements: list[Statement] | TransactionTable) -> TransactionTable:
+    if isinstance(statements, TransactionTable):
+        return statements
+
+    return TransactionTable.from_statements(statements)
+
+def take_date_range(statements: list[Statement] | TransactionTable, start_date: Optional[datetime], end_date: Optional[datetime]) -> tuple[list[Statement] | TransactionTable, datetime, datetime]:
+    table = as_table(statements)
+    index = table.date_index
+
     # do nothing if no dates given
     is_noop = start_date is None and end_date is None
 
     # fill in missing start/end date
-    statements = list(sorted(statements, key=lambda stmt: stmt.summary.date))
-    all_lines = itertools.chain.from_iterable(stmt.lines for stmt in statements)
-    all_lines = filter(lambda line: line.value_date is not None and line.amount, all_lines)
-    all_lines = list(sorted(all_lines, key=lambda line: line.value_date))
     if start_date is None:
-        start_date = all_lines[0].value_date
+        start_date = from_date64(np.datetime64(int(index.first_day.min()), "D"))
     if end_date is None:
-        end_date = all_lines[-1].value_date
+        end_date = from_date64(np.datetime64(int(index.last_day.max()), "D"))
 
     # do nothing if no dates given
     if is_noop:
-        return statements, start_date, end_date
-
-    # process statements
-    new_statements: list[Statement] = []
-    for stmt in statements:
-        stmt_lines = filter(lambda line: line.value_date is not None and line.amount, stmt.lines)
-        stmt_lines = list(sorted(stmt_lines, key=lambda line: line.value_date))
-
-        # stmt dates fully outside range
-        if stmt_lines[-1].value_date < start_date or stmt_lines[0].value_date > end_date:
-            continue
-        # stmt dates fully inside range
-        elif stmt_lines[0].value_date >= start_date and stmt_lines[-1].value_date <= end_date:
-            new_statements.append(stmt)
-        # stmt dates partially inside range
+        return (table if isinstance(statements, TransactionTable) else sort(statements)), start_date, end_date
+
+    start = int(to_date64(start_date).astype("int64"))
+    end = int(to_date64(end_date).astype("int64"))
+
+    # binary search for the statements that can overlap the range
+    lo = np.searchsorted(index.max_last_day, start, side="left")
+    hi = np.searchsorted(index.min_first_day, end, side="right")
+    stmt_ids = np.arange(lo, max(lo, hi))
+    first_day, last_day = index.first_day[stmt_ids], index.last_day[stmt_ids]
+
+    # drop stmts fully outside range
+    overlaps = (last_day >= start) & (first_day <= end)
+    stmt_ids, first_day, last_day = stmt_ids[overlaps], first_day[overlaps], last_day[overlaps]
+    inside = (first_day >= start) & (last_day <= end)
+
+    # transactions before the range and up to the end of the range, from binary search
+    stmt_start = index.starts[stmt_ids]
+    range_start = np.searchsorted(index.keys, pack_date_keys(stmt_ids, start), side="left")
+    range_end = np.searchsorted(index.keys, pack_date_keys(stmt_ids, end), side="right")
+
+    # reconstruct summaries of stmts partially inside range from prefix sums
+    summaries = table.statements[stmt_ids].copy()
+    partial = ~inside
+    old_balance = summaries["old_balance"].copy()
+    summaries["date"] = np.where(partial, np.minimum(summaries["date"], np.datetime64(end, "D")), summaries["date"])
+    summaries["sum_income"] = np.where(partial, index.income[range_end] - index.income[range_start], summaries["sum_income"])
+    summaries["sum_expenses"] = np.where(partial, index.expenses[range_end] - index.expenses[range_start], summaries["sum_expenses"])
+    summaries["old_balance"] = np.where(partial, old_balance + index.balance[range_start] - index.balance[stmt_start], old_balance)
+    summaries["new_balance"] = np.where(partial, old_balance + index.balance[range_end] - index.balance[stmt_start], summaries["new_balance"])
+    summaries["closing_date"] = np.where(partial, np.datetime64("NaT", "D"), summaries["closing_date"])
+    summaries["closing_balance"] = np.where(partial, NO_AMOUNT, summaries["closing_balance"])
+
+    original = table.statements[stmt_ids]
+    assert np.all(summaries["sum_income"] <= original["sum_income"]), "partial statement has more income"
+    assert np.all(summaries["sum_expenses"] >= original["sum_expenses"]), "partial statement has more expenses"
+
+    # fully inside stmts keep all their lines, partial stmts only the transactions in range
+    new_lines: list[np.ndarray] = []
+    for stmt_id, is_inside, i, j in zip(stmt_ids.tolist(), inside.tolist(), range_start.tolist(), range_end.tolist()):
+        if is_inside:
+            new_lines.append(table.statement_lines(stmt_id))
         else:
-            # need to reconstruct new statement summary
-            range_lines = list(filter(lambda line: line.value_date >= start_date and line.value_date <= end_date, stmt_lines))
-            cur_balance = stmt.summary.old_balance
-            summary = IncompleteStatementSummary(
-                date = min(stmt.summary.date, end_date),
-                sum_income = 0.,
-                sum_expenses = 0.,
-                old_balance = cur_balance,
-                new_balance = cur_balance,
-            )
-            # loop over stmt_lines to reconstruct balance
-            for line in stmt_lines:
-                cur_balance += line.amount
-                if line.value_date < start_date:
-                    summary.old_balance = cur_balance
-                if line.value_date <= end_date:
-                    summary.new_balance = cur_balance
-                if line.value_date >= start_date and line.value_date <= end_date:
-                    if line.amount > 0:
-                        summary.sum_income += line.amount
-                    else:
-                        summary.sum_expenses += line.amount
-            # reconstruct Statement
-            assert summary.sum_income <= stmt.summary.sum_income, f"partial statement has more income ({summary.sum_income} vs {stmt.summary.sum_income})"
-            assert summary.sum_expenses >= stmt.summary.sum_expenses, f"partial statement has more expenses ({summary.sum_expenses} vs {stmt.summary.sum_expenses})"
-            new_statements.append(Statement(
-                lines = range_lines,
-                summary = summary.assert_complete()
-            ))
-
-    return new_statements, start_date, end_date
-
-
-def analyze(statements: list[Statement], avg_period: int = 31, difference: bool = False) -> StatementStats:
-    statements = sort(statements)
-
-    lines = itertools.chain.from_iterable(stmt.lines for stmt in statements)
-    lines = filter(lambda line: line.value_date is not None and line.amount, lines)
-    lines = list(sorted(lines, key=lambda line: line.value_date))
-
-    start_balance = statements[0].summary.old_balance
-    end_balance = statements[-1].summary.new_balance
-    start_date = lines[0].value_date
-    end_date = lines[-1].value_date
-    num_days = (end_date - start_date).days + 1
-    dates = iter((i, start_date + timedelta(days=i)) for i in range(num_days))
-
-    stats = StatementStats(
-        datetime    = np.zeros(num_days, dtype='datetime64[h]'),
-        cur_balance = np.zeros(num_days, dtype='float64'),
-        avg_balance = np.zeros(num_days, dtype='float64'),
-        min_balance = np.zeros(num_days, dtype='float64'),
-        max_balance = np.zeros(num_days, dtype='float64'),
+            new_lines.append(table.lines[index.order[i:j]])
+
+    new_table = TransactionTable.from_parts(list(summaries), new_lines, table.texts)
+    new_table.categories, new_table.category_rules = table.categories, table.category_rules
+    if isinstance(statements, TransactionTable):
+        return new_table, start_date, end_date
+
+    return new_table.to_statements(), start_date, end_date
+
+def rolling_window_stats(values: np.ndarray, period: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # every window ends at its element and holds up to period elements, fewer at the start
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - period, 0)
+    sums = np.concatenate(([0], np.cumsum(values)))
+    avg = (sums[ends] - sums[starts]) / (ends - starts)
+
+    # padding with the first element doesn't change the min/max of the shorter windows
+    padded = np.concatenate((np.full(period - 1, values[0]), values))
+    windows = sliding_window_view(padded, period)
+    return avg, windows.min(axis=1), windows.max(axis=1)
+
+def analyze(statements: list[Statement] | TransactionTable, avg_period: int = 31, difference: bool = False) -> StatementStats:
+    table = as_table(statements)
+
+    txns = table.transactions()
+    value_dates = txns["value_date"]
+    start_balance = int(table.statements["old_balance"][0])
+    start_date = value_dates[0]
+    end_date = value_dates[-1]
+    num_days = int((end_date - start_date) // np.timedelta64(1, "D")) + 1
+
+    # balance at the end of each day, transactions are sorted by day so each day is a
+    # contiguous run that is summed in exact integer cents
+    offsets = (value_dates - start_date).astype("int64")
+    days, day_starts = np.unique(offsets, return_index=True)
+    daily = np.zeros(num_days, dtype="int64")
+    daily[days] = np.add.reduceat(txns["amount"], day_starts)
+    balances = start_balance + np.cumsum(daily)
+
+    # history of the last avg_period values, starting with the balance before the first day
+    history = np.concatenate(([start_balance], balances))
+    if difference:
+        first = history[np.maximum(np.arange(num_days) + 2 - avg_period, 0)]
+        history = np.concatenate(([0], balances - first))
+
+    avg_history, min_history, max_history = rolling_window_stats(history, avg_period)
+    return StatementStats(
+        datetime    = (start_date + np.arange(num_days)).astype('datetime64[h]'),
+        cur_balance = history[1:] / 100,
+        avg_balance = avg_history[1:] / 100,
+        min_balance = min_history[1:] / 100,
+        max_balance = max_history[1:] / 100,
     )
 
-    i, cur_date = next(dates)
-    cur_balance = start_balance
-    cur_difference = 0
-    last_balances: deque[float] = deque([cur_balance], maxlen = avg_period)
-    last_differences: deque[float] = deque([cur_difference], maxlen = avg_period)
-    def next_date():
-        nonlocal i, cur_date, cur_difference
-        # update history table
-        last_balances.append(cur_balance)
-        cur_difference = cur_balance - last_balances[0]
-        last_differences.append(cur_difference)
-        # add date to stats
-        stats.datetime[i] = cur_date
-        stats.cur_balance[i] = cur_difference if difference else cur_balance
-        stats.avg_balance[i] = np.average(last_differences if difference else last_balances)
-        stats.min_balance[i] = np.min(last_differences if difference else last_balances)
-        stats.max_balance[i] = np.max(last_differences if difference else last_balances)
-        # go to next date
-        i, cur_date = next(dates)
-
-    for line in lines:
-        assert line.value_date is not None
-        assert line.amount is not None
-
-        while cur_date < line.value_date:
-            next_date()
-
-        # update balance
-        cur_balance += line.amount
-
-    # consume all remaining dates
-    try:
-        while True:
-            next_date()
-    except StopIteration:
-        pass
-
-    return stats
-
 @dataclass
 class StatementPeriodStats:
     labels: list[str] | list[int] = field(default_factory=list)
@@ -156,86 +149,116 @@ class StatementPeriodStats:
     min_income: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype='float64'))
     max_income: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype='float64'))
 
-def analyze_period(statements: list[Statement], categorize: Callable[[StatementLine], int], cumulative: bool = False) -> StatementPeriodStats:
-    statements = sort(statements)
-
-    lines = itertools.chain.from_iterable(stmt.lines for stmt in statements)
-    lines = filter(lambda line: line.value_date is not None and line.amount, lines)
-    lines = list(sorted(lines, key=lambda line: line.value_date))
-
-    num_categories = max(categorize(line) for line in lines) + 1
-    num_expenses = np.zeros(num_categories, dtype=int)
-    sum_expenses = np.zeros(num_categories, dtype='float64')
-    num_income = np.zeros(num_categories, dtype=int)
-    sum_income = np.zeros(num_categories, dtype='float64')
-    stats = StatementPeriodStats(
-        labels = list(range(num_categories)),
-        avg_expenses = np.zeros(num_categories, dtype='float64'),
-        min_expenses = np.zeros(num_categories, dtype='float64'),
-        max_expenses = np.zeros(num_categories, dtype='float64'),
-        avg_income = np.zeros(num_categories, dtype='float64'),
-        min_income = np.zeros(num_categories, dtype='float64'),
-        max_income = np.zeros(num_categories, dtype='float64'),
-    )
-
-    stats.min_expenses[:] = np.inf
-    stats.min_income[:] = np.inf
-
-    category: int | None = None
-    next_category: int
-    cur_expense_sum: float = 0.
-    cur_income_sum: float = 0.
-    def add_stats():
-        nonlocal category, cur_expense_sum, cur_income_sum
-        if category is None:
-            return
-
-        num_expenses[category] += 1
-        sum_expenses[category] += cur_expense_sum
-        stats.min_expenses[category] = min(stats.min_expenses[category], cur_expense_sum)
-        stats.max_expenses[category] = max(stats.max_expenses[category], cur_expense_sum)
-
-        num_income[category] += 1
-        sum_income[category] += cur_income_sum
-        stats.min_income[category] = min(stats.min_income[category], cur_income_sum)
-        stats.max_income[category] = max(stats.max_income[category], cur_income_sum)
-
-        if not cumulative or next_category < category:
-            cur_income_sum = 0.
-            cur_expense_sum = 0.
-
-    for line in lines:
-        next_category = categorize(line)
-        if next_category != category:
-            add_stats()
-            category = next_category
-
-        if line.amount < 0:
-            cur_expense_sum += abs(line.amount)
-        else:
-            cur_income_sum += abs(line.amount)
+# maps sorted transactions to (period, category) keys, e.g. (year, month of year)
+PeriodKeys = Callable[[np.ndarray], tuple[np.ndarray, np.ndarray]]
+
+def days_since_epoch(txns: np.ndarray) -> np.ndarray:
+    return txns["value_date"].astype("int64")
+
+def months_since_epoch(txns: np.ndarray) -> np.ndarray:
+    return txns["value_date"].astype("datetime64[M]").astype("int64")
+
+def month_of_year(txns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    months = months_since_epoch(txns)
+    return months // 12, months % 12
+
+def quarter_of_year(txns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    months = months_since_epoch(txns)
+    return months // 12, months % 12 // 3
+
+def day_of_month(txns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    months = txns["value_date"].astype("datetime64[M]")
+    return months.astype("int64"), (txns["value_date"] - months.astype("datetime64[D]")).astype("int64")
+
+def day_of_week(txns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # 1970-01-01 was a thursday, shift so that weeks start on monday
+    days = days_since_epoch(txns) + 3
+    return days // 7, days % 7
+
+def week_of_year(txns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # iso weeks belong to the year of their thursday
+    days = days_since_epoch(txns)
+    thursdays = days - (days + 3) % 7 + 3
+    years = thursdays.astype("datetime64[D]").astype("datetime64[Y]")
+    return years.astype("int64"), (thursdays - years.astype("datetime64[D]").astype("int64")) // 7
+
+def analyze_period(statements: list[Statement] | TransactionTable, keys: PeriodKeys, cumulative: bool = False, num_categories: Optional[int] = None, num_periods: Optional[int] = None) -> StatementPeriodStats:
+    # averages are taken over the periods in which a category occurs, unless the
+    # number of periods is given, then periods without transactions count as zero
+    table = as_table(statements)
+
+    txns = table.transactions()
+    period, category = keys(txns)
+    if num_categories is None:
+        num_categories = int(category.max()) + 1
+
+    # group transactions into segments with the same (period, category)
+    order = np.lexsort((category, period))
+    period, category, amounts = period[order], category[order], txns["amount"][order]
+    changes = (period[1:] != period[:-1]) | (category[1:] != category[:-1])
+    starts = np.concatenate(([0], np.flatnonzero(changes) + 1))
+
+    seg_period, seg_category = period[starts], category[starts]
+    seg_expenses = np.add.reduceat(np.where(amounts < 0, -amounts, 0), starts)
+    seg_income = np.add.reduceat(np.where(amounts > 0, amounts, 0), starts)
+
+    # accumulate segments within each period
+    if cumulative:
+        period_starts = np.concatenate(([True], seg_period[1:] != seg_period[:-1]))
+        first = np.maximum.accumulate(np.where(period_starts, np.arange(len(starts)), 0))
+        for seg_sums in (seg_expenses, seg_income):
+            sums = np.cumsum(seg_sums)
+            seg_sums[:] = sums - sums[first] + seg_sums[first]
+
+    # sums, minima and maxima stay in integer cents, only the results are converted
+    stats = StatementPeriodStats(labels = list(range(num_categories)))
+    num = np.bincount(seg_category, minlength=num_categories)
+    divisor = num if num_periods is None else np.full(num_categories, num_periods)
+    for name, seg_sums in (("expenses", seg_expenses), ("income", seg_income)):
+        totals = np.zeros(num_categories, dtype='int64')
+        min_values = np.full(num_categories, np.iinfo(np.int64).max)
+        max_values = np.zeros(num_categories, dtype='int64')
+        np.add.at(totals, seg_category, seg_sums)
+        np.minimum.at(min_values, seg_category, seg_sums)
+        np.maximum.at(max_values, seg_category, seg_sums)
+
+        if num_periods is not None:
+            min_values = np.where(num < num_periods, 0, min_values)
+
+        setattr(stats, f"avg_{name}", np.divide(totals, divisor, out=np.zeros(num_categories), where=divisor > 0) / 100)
+        setattr(stats, f"min_{name}", np.where(divisor > 0, min_values / 100, np.inf))
+        setattr(stats, f"max_{name}", max_values / 100)
 
-    add_stats()
-
-    stats.avg_expenses = sum_expenses / num_expenses
-    stats.avg_income = sum_income / num_income
+    return stats
 
+def category_keys(categorizer: Categorizer, table: TransactionTable, period: Callable[[np.ndarray], np.ndarray] = months_since_epoch) -> PeriodKeys:
+    # transactions keep their interned text, so categories are looked up per distinct text
+    text_categories = categorizer.table_categories(table)
+    return lambda txns: (period(txns), text_categories[txns["text"]])
+
+def analyze_categories(statements: list[Statement] | TransactionTable, categorizer: Categorizer, period: Callable[[np.ndarray], np.ndarray] = months_since_epoch, cumulative: bool = False) -> StatementPeriodStats:
+    table = as_table(statements)
+    keys = category_keys(categorizer, table, period)
+
+    # averages are per period between the first and last transaction, so that rare
+    # categories aren't averaged over the few periods in which they occur
+    periods = period(table.transactions())
+    num_periods = int(periods.max() - periods.min()) + 1 if len(periods) else 0
+    stats = analyze_period(table, keys, cumulative = cumulative, num_categories = len(categorizer.labels), num_periods = num_periods)
+    stats.labels = [categorizer.labels[i] for i in stats.labels]
     return stats
 
-def analyze_yearly(statements: list[Statement], cumulative: bool = False) -> StatementPeriodStats:
-    categorize = lambda stmt: stmt.value_date.month - 1
-    stats = analyze_period(statements, categorize, cumulative = cumulative)
+def analyze_yearly(statements: list[Statement] | TransactionTable, cumulative: bool = False) -> StatementPeriodStats:
+    stats = analyze_period(statements, month_of_year, cumulative = cumulative)
     stats.labels = [calendar.month_name[i+1] for i in stats.labels]
     return stats
 
-def analyze_monthly(statements: list[Statement], cumulative: bool = False) -> StatementPeriodStats:
-    categorize = lambda stmt: stmt.value_date.day - 1
-    stats = analyze_period(statements, categorize, cumulative = cumulative)
+def analyze_monthly(statements: list[Statement] | TransactionTable, cumulative: bool = False) -> StatementPeriodStats:
+    stats = analyze_period(statements, day_of_month, cumulative = cumulative)
     stats.labels = [i+1 for i in stats.labels]
     return stats
 
-def analyze_weekly(statements: list[Statement], cumulative: bool = False) -> StatementPeriodStats:
-    categorize = lambda stmt: stmt.value_date.weekday()
-    stats = analyze_period(statements, categorize, cumulative = cumulative)
+def analyze_weekly(statements: list[Statement] | TransactionTable, cumulative: bool = False) -> StatementPeriodStats:
+    stats = analyze_period(statements, day_of_week, cumulative = cumulative)
     stats.labels = [calendar.day_name[i] for i in stats.labels]
     return stats
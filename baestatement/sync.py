@@ -0,0 +1,169 @@
+from typing import Any, Callable, Optional, TYPE_CHECKING
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+import pickle
+import json
+
+from .parse import Statement, PARSER_VERSION
+from .cache import hash_file, write_atomic
+
+# the search index is only needed by tools that search or update it
+if TYPE_CHECKING:
+    from .search import SearchIndex
+    from .categorize import Categorizer
+
+# bump whenever the on-disk sync store format changes
+SYNC_VERSION: int = 1
+SYNC_DIR: str = ".baestatement"
+
+@dataclass
+class ManifestEntry:
+    size: int
+    mtime_ns: int
+    digest: str
+
+@dataclass
+class Manifest:
+    version: int = SYNC_VERSION
+    parser_version: int = PARSER_VERSION
+    options: dict[str, Any] = field(default_factory=dict)
+    files: dict[str, ManifestEntry] = field(default_factory=dict)
+
+@dataclass
+class SyncResult:
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+def sync_dir(path: Path) -> Path:
+    return path / SYNC_DIR
+
+def sync_table_path(path: Path) -> Path:
+    return sync_dir(path) / "table"
+
+def sync_index_path(path: Path) -> Path:
+    return sync_dir(path) / "index.pickle"
+
+def is_synced(path: Path) -> bool:
+    return (sync_dir(path) / "manifest.json").exists()
+
+def load_manifest(path: Path) -> Manifest:
+    try:
+        with open(sync_dir(path) / "manifest.json", "r") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return Manifest()
+
+    data["files"] = { name: ManifestEntry(**entry) for name, entry in data["files"].items() }
+    return Manifest(**data)
+
+def load_synced_statements(path: Path) -> dict[str, Statement]:
+    try:
+        with open(sync_dir(path) / "statements.pickle", "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return {}
+
+def load_synced_index(path: Path) -> "SearchIndex":
+    from .search import build_search_index, load_search_index
+
+    # indices written by older versions are rebuilt from the stored statements
+    index = load_search_index(sync_index_path(path))
+    if index is None:
+        index = build_search_index(load_synced_statements(path))
+        write_atomic(sync_index_path(path), pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
+
+    return index
+
+def sync_archive(path: Path, files: list[Path], parse: Callable[[list[Path]], dict[Path, Statement]], options: dict[str, Any], categorizer: Optional["Categorizer"] = None) -> SyncResult:
+    from .table import TransactionTable, read_table_meta, table_category_rules
+    from .categorize import Categorizer
+
+    result = SyncResult()
+    manifest = load_manifest(path)
+    store = sync_dir(path)
+
+    # reparse everything if the store was written by a different parser or with different options,
+    # stored statements of other parser versions may not even unpickle
+    reset = manifest.version != SYNC_VERSION or manifest.parser_version != PARSER_VERSION or manifest.options != options
+    reset = reset or not (store / "statements.pickle").exists()
+    if reset:
+        manifest = Manifest(options = options)
+
+    current = { file.name: file for file in files }
+    for name in list(manifest.files):
+        if name not in current:
+            del manifest.files[name]
+            result.removed.append(name)
+
+    # only hash files whose size or mtime changed, and only parse files whose hash changed
+    changed: dict[Path, ManifestEntry] = {}
+    for name, file in current.items():
+        st = file.stat()
+        entry = manifest.files.get(name)
+        if entry is not None and entry.size == st.st_size and entry.mtime_ns == st.st_mtime_ns:
+            continue
+
+        new_entry = ManifestEntry(st.st_size, st.st_mtime_ns, hash_file(file))
+        if entry is not None and entry.digest == new_entry.digest:
+            manifest.files[name] = new_entry
+            continue
+
+        changed[file] = new_entry
+
+    parsed = parse(list(changed))
+    for file, new_entry in changed.items():
+        if file not in parsed:
+            # the old statement of a file that no longer parses is dropped from the store
+            if manifest.files.pop(file.name, None) is not None:
+                result.removed.append(file.name)
+            result.failed.append(file.name)
+            continue
+
+        (result.updated if file.name in manifest.files else result.added).append(file.name)
+        manifest.files[file.name] = new_entry
+
+    # the stored statements are only unpickled when something has to be merged into them,
+    # otherwise tools go straight to the saved table
+    store.mkdir(exist_ok=True)
+    index_path = sync_index_path(path)
+    table_path = sync_table_path(path)
+    saved_rules = table_category_rules(read_table_meta(table_path)) if TransactionTable.exists(table_path) else []
+    if reset or result.changed() or not TransactionTable.exists(table_path) or not index_path.exists():
+        stmts = {} if reset else load_synced_statements(path)
+        for name in result.removed:
+            stmts.pop(name, None)
+        for file, stmt in parsed.items():
+            stmts[file.name] = stmt
+
+        # the rebuilt table keeps the categories of the rules it was last categorized with
+        if categorizer is None and saved_rules:
+            categorizer = Categorizer(saved_rules)
+        table = TransactionTable.from_statements(list(stmts.values()))
+        if categorizer is not None:
+            table.categorize(categorizer)
+        table.save(table_path)
+        write_atomic(store / "statements.pickle", pickle.dumps(stmts, protocol=pickle.HIGHEST_PROTOCOL))
+
+        # the search index only reindexes changed files, unless it is missing or outdated
+        from .search import build_search_index, load_search_index
+        index = None if reset else load_search_index(index_path)
+        if index is None:
+            index = build_search_index(stmts)
+        else:
+            for name in result.removed:
+                index.remove(name)
+            for name in (*result.added, *result.updated):
+                index.update(name, stmts[name])
+        write_atomic(index_path, pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
+    elif categorizer is not None and saved_rules != categorizer.rules:
+        table = TransactionTable.load(table_path)
+        table.categorize(categorizer)
+        table.save(table_path)
+
+    write_atomic(store / "manifest.json", json.dumps(asdict(manifest)).encode())
+    return result
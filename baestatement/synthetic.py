@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+from html import escape
+from io import StringIO
+from pathlib import Path
+import random
+import math
+
+from .pdf import PageFields, normalize_field_position
+from .parse import Statement, StatementLine, StatementSummary, to_cents, from_cents
+from .layout import LayoutProfile, Region, DEFAULT_LAYOUT
+from .format.json import format_json
+
+# synthetic statements for benchmarks, shaped like real ones but without any real data
+
+# fields as (left, top, text) in pdftohtml pixel coordinates at zoom 1
+PixelFields = list[tuple[int, int, str]]
+
+PAGE_SIZE: tuple[int, int] = (1782, 864)
+ROW_HEIGHT: int = 12
+
+def format_field_amount(cents: int) -> str:
+    # amounts are printed like 1.234,56 with a trailing minus for negative amounts
+    units = f"{abs(cents) // 100:,}".replace(",", ".")
+    return f"{units},{abs(cents) % 100:02}{'-' if cents < 0 else ''}"
+
+def synthetic_statements(num_statements: int, lines_per_statement: int, seed: int = 0, start_date: datetime = datetime(2005, 1, 1)) -> list[Statement]:
+    rng = random.Random(seed)
+    stmts: list[Statement] = []
+    balance = 100000
+    date = start_date
+
+    for _ in range(num_statements):
+        end_date = date + timedelta(days=30)
+        old_balance, sum_income, sum_expenses = balance, 0, 0
+
+        lines: list[StatementLine] = []
+        for _ in range(lines_per_statement):
+            value_date = date + timedelta(days=rng.randrange(31))
+            amount = rng.choice([rng.randrange(-50000, -1), rng.randrange(1, 150000)])
+            if amount > 0:
+                sum_income += amount
+            else:
+                sum_expenses += amount
+            balance += amount
+
+            text = f"payee {rng.randrange(200)}\nreference {rng.randrange(100000)}"
+            lines.append(StatementLine(text, from_cents(amount), value_date, value_date))
+
+        # the closing booking can only state positive balances
+        lines.sort(key=lambda line: line.booking_date)
+        summary = StatementSummary(end_date, from_cents(sum_expenses), from_cents(sum_income), from_cents(old_balance), from_cents(balance))
+        if balance >= 0:
+            lines.append(StatementLine(f"Ihr Kontostand per {end_date:%d.%m.%Y}: EUR {format_field_amount(balance)}"))
+            summary.closing_date, summary.closing_balance = end_date, from_cents(balance)
+
+        stmts.append(Statement(lines, summary))
+        date = end_date + timedelta(days=1)
+
+    return stmts
+
+def column_left(region: Region, column: int, page_size: tuple[int, int]) -> int:
+    # fields start just right of the previous column end
+    start = region.min[0] if column == 0 else region.columns[column - 1][0]
+    return math.ceil(start * page_size[0]) + 4
+
+def region_rows(region: Region, page_size: tuple[int, int]) -> list[int]:
+    top, bottom = math.ceil(region.min[1] * page_size[1]), math.floor(region.max[1] * page_size[1])
+    return list(range(top + ROW_HEIGHT // 2, bottom, ROW_HEIGHT))
+
+def synthetic_pixel_pages(stmt: Statement, layout: LayoutProfile = DEFAULT_LAYOUT, page_size: tuple[int, int] = PAGE_SIZE) -> list[PixelFields]:
+    columns = { name: column_left(layout.lines, i, page_size) for i, (_end, name) in enumerate(layout.lines.columns) }
+    fmt_day = lambda date: f"{date:%d.%m}"
+
+    # every line takes one row per line of text, dates and amount go on its first and last row
+    rows: list[list[tuple[str, str]]] = []
+    for line in stmt.lines:
+        text_lines = line.text.split("\n")
+        for i, text in enumerate(text_lines):
+            row = [("text", text)]
+            if i == 0 and line.booking_date is not None:
+                row.append(("booking_date", fmt_day(line.booking_date)))
+            if i == len(text_lines) - 1 and line.value_date is not None:
+                row.append(("value_date", fmt_day(line.value_date)))
+            if i == len(text_lines) - 1 and line.amount is not None:
+                row.append(("amount", format_field_amount(to_cents(line.amount))))
+            rows.append(row)
+
+    # the first page has no lines, the last page has the summary
+    width, height = page_size
+    tops = region_rows(layout.lines, page_size)
+    pages: list[PixelFields] = [[(width // 10, height // 20, "Kontoauszug")]]
+    for start in range(0, max(len(rows), 1), len(tops)):
+        page: PixelFields = []
+        for top, row in zip(tops, rows[start:start + len(tops)]):
+            page += [(columns[name], top, text) for name, text in row]
+        page.append((width * 9 // 10, height * 19 // 20, f"Seite {len(pages) + 1}"))
+        pages.append(page)
+
+    summary = stmt.summary
+    summary_top = region_rows(layout.summary, page_size)[0]
+    summary_fields = {
+        "old_balance": summary.old_balance,
+        "sum_expenses": summary.sum_expenses,
+        "sum_income": summary.sum_income,
+        "new_balance": summary.new_balance,
+    }
+    for i, (_end, name) in enumerate(layout.summary.columns):
+        pages[-1].append((column_left(layout.summary, i, page_size), summary_top, format_field_amount(to_cents(summary_fields[name]))))
+    pages[-1].append((column_left(layout.date, 0, page_size), region_rows(layout.date, page_size)[0], f"{summary.date:%d.%m.%Y}"))
+
+    return pages
+
+def synthetic_page_fields(stmt: Statement, layout: LayoutProfile = DEFAULT_LAYOUT, page_size: tuple[int, int] = PAGE_SIZE, precision: int = 4) -> list[PageFields]:
+    # page fields as extracted from pdftohtml output of a statement
+    width, height = page_size
+    return [
+        { normalize_field_position(left, top, width, height, precision): text for left, top, text in page }
+        for page in synthetic_pixel_pages(stmt, layout, page_size)
+    ]
+
+def synthetic_html(stmt: Statement, layout: LayoutProfile = DEFAULT_LAYOUT, page_size: tuple[int, int] = PAGE_SIZE) -> str:
+    # html in the format of pdftohtml -s -noframes -i, with non-breaking spaces like pdftohtml
+    width, height = page_size
+    html = StringIO()
+    html.write("<!DOCTYPE html><html>\n<head><title>statement</title></head>\n<body bgcolor=\"#A0A0A0\" vlink=\"blue\" link=\"blue\">\n")
+    for i, page in enumerate(synthetic_pixel_pages(stmt, layout, page_size), 1):
+        html.write(f"<!-- Page {i} -->\n<a name=\"{i}\"></a>\n")
+        html.write(f"<div id=\"page{i}-div\" style=\"position:relative;width:{width}px;height:{height}px;\">\n")
+        for left, top, text in page:
+            text = escape(text).replace(" ", "&#160;")
+            html.write(f"<p style=\"position:absolute;top:{top}px;left:{left}px;white-space:nowrap\" class=\"ft00\">{text}</p>\n")
+        html.write("</div>\n")
+    html.write("</body>\n</html>\n")
+    return html.getvalue()
+
+def write_synthetic_json(stmts: list[Statement], path: Path) -> list[Path]:
+    path.mkdir(parents=True, exist_ok=True)
+    files: list[Path] = []
+    for stmt in stmts:
+        file = path / f"estatement-{stmt.summary.date:%Y-%m-%d}.json"
+        file.write_text(format_json(stmt))
+        files.append(file)
+
+    return files
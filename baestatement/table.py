@@ -0,0 +1,296 @@
+from typing import Optional
+from dataclasses import dataclass, field
+from functools import cached_property
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+import numpy as np
+
+from .parse import Statement, StatementLine, StatementSummary, to_cents, from_cents
+from .cache import write_atomic
+from .categorize import Rule, Categorizer
+
+# bump whenever the on-disk table format changes, version 1 tables had fixed array file names
+TABLE_VERSION: int = 2
+
+# amounts are stored as integer cents, missing amounts use this sentinel
+NO_AMOUNT: int = int(np.iinfo(np.int64).min)
+
+LINE_DTYPE = np.dtype([
+    ("value_date",      "datetime64[D]"),
+    ("booking_date",    "datetime64[D]"),
+    ("amount",          "int64"),
+    ("statement",       "int32"),
+    ("text",            "int32"),
+])
+
+STATEMENT_DTYPE = np.dtype([
+    ("date",            "datetime64[D]"),
+    ("sum_expenses",    "int64"),
+    ("sum_income",      "int64"),
+    ("old_balance",     "int64"),
+    ("new_balance",     "int64"),
+    ("closing_date",    "datetime64[D]"),
+    ("closing_balance", "int64"),
+    ("lines_start",     "int64"),
+    ("lines_end",       "int64"),
+])
+
+def read_table_meta(path: Path) -> dict:
+    with open(path / "texts.json", "r") as f:
+        meta = json.load(f)
+    assert meta["version"] in (1, TABLE_VERSION), f"unsupported transaction table version {meta['version']}"
+    return meta
+
+def table_files(meta: dict) -> dict[str, str]:
+    return meta.get("files", { "statements": "statements.npy", "lines": "lines.npy" })
+
+def table_category_rules(meta: dict) -> list[Rule]:
+    return [Rule(category, keyword) for category, keyword in meta.get("category_rules", [])]
+
+def to_table_amount(amount: Optional[float]) -> int:
+    if amount is None:
+        return NO_AMOUNT
+
+    return to_cents(amount)
+
+def from_table_amount(cents: int) -> Optional[float]:
+    if cents == NO_AMOUNT:
+        return None
+
+    return from_cents(int(cents))
+
+def to_date64(date: Optional[datetime]) -> np.datetime64:
+    if date is None:
+        return np.datetime64("NaT", "D")
+
+    return np.datetime64(date.date(), "D")
+
+def from_date64(date: np.datetime64) -> Optional[datetime]:
+    if np.isnat(date):
+        return None
+
+    return date.astype("datetime64[us]").item()
+
+def is_transaction(lines: np.ndarray) -> np.ndarray:
+    return ~np.isnat(lines["value_date"]) & (lines["amount"] != NO_AMOUNT) & (lines["amount"] != 0)
+
+# transactions are searched by (statement, day) keys packed into a single int64
+def pack_date_keys(statements: np.ndarray, days: np.ndarray | int) -> np.ndarray:
+    return statements.astype("int64") * 2**32 + (days + 2**31)
+
+@dataclass
+class DateIndex:
+    # line indices of transactions, sorted by statement and then by value date
+    order: np.ndarray
+    # packed (statement, day) search keys of the sorted transactions
+    keys: np.ndarray
+    # per statement range into order
+    starts: np.ndarray
+    ends: np.ndarray
+    # per statement first and last value day, statements without transactions
+    # get sentinels that place them outside of every range
+    first_day: np.ndarray
+    last_day: np.ndarray
+    # running max of last days and running min of first days from the right,
+    # both are sorted and bound which statements can overlap a date range
+    max_last_day: np.ndarray
+    min_first_day: np.ndarray
+    # prefix sums of amounts, income and expenses over the sorted transactions
+    balance: np.ndarray
+    income: np.ndarray
+    expenses: np.ndarray
+
+@dataclass
+class TransactionTable:
+    # statements sorted by date, lines grouped by statement in statement order
+    statements: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=STATEMENT_DTYPE))
+    lines: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=LINE_DTYPE))
+    # interned line texts, indexed by lines["text"]
+    texts: list[str] = field(default_factory=list)
+    # category id of every interned text, computed with category_rules
+    categories: Optional[np.ndarray] = None
+    category_rules: list[Rule] = field(default_factory=list)
+
+    @staticmethod
+    def from_statements(statements: list[Statement]) -> "TransactionTable":
+        statements = list(sorted(statements, key=lambda stmt: stmt.summary.date))
+        num_lines = sum(len(stmt.lines) for stmt in statements)
+
+        table = TransactionTable(
+            statements = np.zeros(len(statements), dtype=STATEMENT_DTYPE),
+            lines = np.zeros(num_lines, dtype=LINE_DTYPE),
+        )
+
+        text_ids: dict[str, int] = {}
+        value_dates: list[Optional[datetime]] = []
+        booking_dates: list[Optional[datetime]] = []
+        amounts: list[int] = []
+        stmt_ids: list[int] = []
+        texts: list[int] = []
+
+        for i, stmt in enumerate(statements):
+            summary = stmt.summary
+            table.statements[i] = (
+                to_date64(summary.date),
+                to_table_amount(summary.sum_expenses),
+                to_table_amount(summary.sum_income),
+                to_table_amount(summary.old_balance),
+                to_table_amount(summary.new_balance),
+                to_date64(summary.closing_date),
+                to_table_amount(summary.closing_balance),
+                len(amounts),
+                len(amounts) + len(stmt.lines),
+            )
+
+            for line in stmt.lines:
+                value_dates.append(line.value_date)
+                booking_dates.append(line.booking_date)
+                amounts.append(to_table_amount(line.amount))
+                stmt_ids.append(i)
+                texts.append(text_ids.setdefault(line.text, len(text_ids)))
+
+        table.lines["value_date"] = np.array(value_dates, dtype="datetime64[D]")
+        table.lines["booking_date"] = np.array(booking_dates, dtype="datetime64[D]")
+        table.lines["amount"] = amounts
+        table.lines["statement"] = stmt_ids
+        table.lines["text"] = texts
+        table.texts = list(text_ids)
+        return table
+
+    @staticmethod
+    def from_parts(statements: list[np.void], lines: list[np.ndarray], texts: list[str]) -> "TransactionTable":
+        table = TransactionTable(
+            statements = np.array(statements, dtype=STATEMENT_DTYPE),
+            lines = np.concatenate(lines) if lines else np.zeros(0, dtype=LINE_DTYPE),
+            texts = texts,
+        )
+
+        # renumber statements and line ranges
+        sizes = np.array([len(part) for part in lines], dtype="int64")
+        ends = np.cumsum(sizes)
+        table.statements["lines_start"] = ends - sizes
+        table.statements["lines_end"] = ends
+        table.lines["statement"] = np.repeat(np.arange(len(lines), dtype="int32"), sizes)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def statement_lines(self, i: int) -> np.ndarray:
+        stmt = self.statements[i]
+        return self.lines[stmt["lines_start"]:stmt["lines_end"]]
+
+    def transactions(self) -> np.ndarray:
+        # all lines with a value date and a nonzero amount, stably sorted by value date
+        lines = self.lines[is_transaction(self.lines)]
+        return lines[np.argsort(lines["value_date"], kind="stable")]
+
+    @cached_property
+    def date_index(self) -> DateIndex:
+        order = np.flatnonzero(is_transaction(self.lines))
+        lines = self.lines[order]
+        days = lines["value_date"].astype("int64")
+        stmts = lines["statement"]
+
+        # lexsort is stable, so lines with the same value date keep their order
+        sort = np.lexsort((days, stmts))
+        order, days, stmts, amounts = order[sort], days[sort], stmts[sort], lines["amount"][sort]
+
+        stmt_ids = np.arange(len(self.statements))
+        starts = np.searchsorted(stmts, stmt_ids, side="left")
+        ends = np.searchsorted(stmts, stmt_ids, side="right")
+        empty = starts == ends
+        padded_days = np.concatenate((days, [0]))
+
+        first_day = np.where(empty, np.iinfo(np.int64).max, padded_days[starts])
+        last_day = np.where(empty, np.iinfo(np.int64).min, padded_days[ends - 1])
+
+        prefix = lambda values: np.concatenate(([0], np.cumsum(values)))
+        return DateIndex(
+            order = order,
+            keys = pack_date_keys(stmts, days),
+            starts = starts,
+            ends = ends,
+            first_day = first_day,
+            last_day = last_day,
+            max_last_day = np.maximum.accumulate(last_day),
+            min_first_day = np.minimum.accumulate(first_day[::-1])[::-1],
+            balance = prefix(amounts),
+            income = prefix(np.where(amounts > 0, amounts, 0)),
+            expenses = prefix(np.where(amounts < 0, amounts, 0)),
+        )
+
+    def categorize(self, categorizer: Categorizer):
+        self.categories = categorizer.categorize_texts(self.texts)
+        self.category_rules = list(categorizer.rules)
+
+    def to_statement(self, i: int) -> Statement:
+        stmt = self.statements[i]
+        lines = [
+            StatementLine(
+                text = self.texts[line["text"]],
+                amount = from_table_amount(line["amount"]),
+                booking_date = from_date64(line["booking_date"]),
+                value_date = from_date64(line["value_date"]),
+            )
+            for line in self.statement_lines(i)
+        ]
+
+        return Statement(lines, StatementSummary(
+            date = from_date64(stmt["date"]),
+            sum_expenses = from_table_amount(stmt["sum_expenses"]),
+            sum_income = from_table_amount(stmt["sum_income"]),
+            old_balance = from_table_amount(stmt["old_balance"]),
+            new_balance = from_table_amount(stmt["new_balance"]),
+            closing_date = from_date64(stmt["closing_date"]),
+            closing_balance = from_table_amount(stmt["closing_balance"]),
+        ))
+
+    def to_statements(self) -> list[Statement]:
+        return [self.to_statement(i) for i in range(len(self))]
+
+    def save(self, path: Path):
+        # arrays are written under fresh names, then texts.json is replaced atomically to
+        # point at them, so readers never mix statements, lines and texts of different saves
+        path.mkdir(parents=True, exist_ok=True)
+        previous = table_files(read_table_meta(path)) if TransactionTable.exists(path) else {}
+
+        generation = os.urandom(6).hex()
+        files: dict[str, str] = {}
+        arrays = [("statements", self.statements), ("lines", self.lines)]
+        if self.categories is not None:
+            arrays.append(("categories", self.categories))
+        for name, array in arrays:
+            files[name] = f"{name}-{generation}.npy"
+            np.save(path / files[name], array)
+
+        meta = { "version": TABLE_VERSION, "files": files, "texts": self.texts }
+        if self.categories is not None:
+            meta["category_rules"] = [[rule.category, rule.keyword] for rule in self.category_rules]
+        write_atomic(path / "texts.json", json.dumps(meta).encode())
+
+        # the previous arrays stay for readers that read texts.json just before it was replaced
+        keep = { *files.values(), *previous.values() }
+        for file in path.glob("*.npy"):
+            if file.name not in keep:
+                file.unlink(missing_ok=True)
+
+    @staticmethod
+    def load(path: Path, mmap: bool = True) -> "TransactionTable":
+        meta = read_table_meta(path)
+        files = table_files(meta)
+
+        mmap_mode = "r" if mmap else None
+        return TransactionTable(
+            statements = np.load(path / files["statements"], mmap_mode=mmap_mode),
+            lines = np.load(path / files["lines"], mmap_mode=mmap_mode),
+            texts = meta["texts"],
+            categories = np.load(path / files["categories"], mmap_mode=mmap_mode) if "categories" in files else None,
+            category_rules = table_category_rules(meta),
+        )
+
+    @staticmethod
+    def exists(path: Path) -> bool:
+        return (path / "texts.json").exists()
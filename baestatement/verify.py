@@ -0,0 +1,69 @@
+from typing import Callable
+from dataclasses import dataclass
+from datetime import datetime
+import numpy as np
+
+from .table import TransactionTable, NO_AMOUNT, from_date64
+from .format.util import fmt_amount, fmt_date
+
+@dataclass
+class VerifyIssue:
+    # index of the statement in the table, statements are sorted by date
+    statement: int
+    date: datetime
+    kind: str
+    message: str
+
+def verify_table(table: TransactionTable) -> list[VerifyIssue]:
+    stmts = table.statements
+    amounts = table.lines["amount"]
+    has_amount = amounts != NO_AMOUNT
+
+    # per statement sums of line amounts from prefix sums, lines are grouped by statement
+    prefix = lambda values: np.concatenate(([0], np.cumsum(values)))
+    starts, ends = stmts["lines_start"], stmts["lines_end"]
+    balance = prefix(np.where(has_amount, amounts, 0))
+    income = prefix(np.where(has_amount & (amounts > 0), amounts, 0))
+    expenses = prefix(np.where(has_amount & (amounts < 0), amounts, 0))
+    line_balance = balance[ends] - balance[starts]
+    line_income = income[ends] - income[starts]
+    line_expenses = expenses[ends] - expenses[starts]
+
+    old_balance, new_balance = stmts["old_balance"], stmts["new_balance"]
+    sum_income, sum_expenses = stmts["sum_income"], stmts["sum_expenses"]
+    summary_balance = old_balance + sum_income + sum_expenses
+    difference = new_balance - old_balance
+
+    # consecutive statements must chain, a mismatch means statements are missing in between,
+    # unless both have the same date, which means the same statement was loaded twice
+    same_date = np.concatenate(([False], stmts["date"][1:] == stmts["date"][:-1]))
+    chains = np.concatenate(([True], new_balance[:-1] == old_balance[1:]))
+    prev_balance = np.concatenate(([0], new_balance[:-1]))
+
+    amount = lambda cents: fmt_amount(int(cents) / 100).strip()
+    checks: list[tuple[str, np.ndarray, Callable[[int], str]]] = [
+        ("balance", summary_balance != new_balance,
+            lambda i: f"old balance plus income and expenses is {amount(summary_balance[i])}, but new balance is {amount(new_balance[i])}"),
+        ("lines", line_balance != difference,
+            lambda i: f"sum of lines is {amount(line_balance[i])}, but balance changed by {amount(difference[i])}"),
+        ("income", line_income != sum_income,
+            lambda i: f"sum of income lines is {amount(line_income[i])}, but sum of income is {amount(sum_income[i])}"),
+        ("expenses", line_expenses != sum_expenses,
+            lambda i: f"sum of expense lines is {amount(line_expenses[i])}, but sum of expenses is {amount(sum_expenses[i])}"),
+        ("duplicate", same_date,
+            lambda i: "statement date appears more than once"),
+        ("gap", ~chains & ~same_date,
+            lambda i: f"previous statement ends with balance {amount(prev_balance[i])}, but this statement starts with {amount(old_balance[i])}"),
+    ]
+
+    # only statements that fail a check are looked at individually
+    issues: list[VerifyIssue] = []
+    for kind, failed, message in checks:
+        for i in np.flatnonzero(failed).tolist():
+            issues.append(VerifyIssue(i, from_date64(stmts["date"][i]), kind, message(i)))
+
+    issues.sort(key=lambda issue: issue.statement)
+    return issues
+
+def format_issue(issue: VerifyIssue) -> str:
+    return f"{fmt_date(issue.date)}: {issue.kind}: {issue.message}"
@@ -0,0 +1,76 @@
+from argparse import ArgumentParser
+from datetime import timedelta
+from typing import Optional
+import random
+import time
+import re
+
+from baestatement.parse import parse_field_amount, parse_field_cents
+from baestatement.stats import take_date_range
+from baestatement.table import TransactionTable
+from baestatement.synthetic import synthetic_statements
+
+def parse_field_amount_regex(field: str) -> Optional[float]:
+    # regex callback reference implementation that parse_field_cents replaced
+    field = field.strip()
+    if field == "":
+        return None
+
+    if field.endswith("-"):
+        field = "-" + field.rstrip("-")
+
+    REPLACEMENTS = { ".": "", ",": "." }
+    field = re.sub("[.,]", lambda match: REPLACEMENTS[match.group()], field)
+    return float(field)
+
+def synthetic_fields(num_fields: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    fields: list[str] = []
+    for _ in range(num_fields):
+        cents = rng.randrange(10 ** rng.randrange(1, 10))
+        units = f"{cents // 100:,}".replace(",", ".")
+        fields.append(f" {units},{cents % 100:02}{rng.choice(['', '-'])} ")
+
+    return fields
+
+def timed(f, fields: list[str]) -> float:
+    start = time.perf_counter()
+    for field in fields:
+        f(field)
+    return time.perf_counter() - start
+
+def check_reconciliation(table: TransactionTable, num_ranges: int, seed: int = 0):
+    # every sliced statement must add up exactly, and consecutive statements must chain
+    rng = random.Random(seed)
+    _table, first, last = take_date_range(table, None, None)
+    num_days = (last - first).days
+    for _ in range(num_ranges):
+        start = first + timedelta(days=rng.randrange(num_days))
+        end = start + timedelta(days=rng.randrange(num_days))
+        stmts = take_date_range(table, start, end)[0].statements
+        assert (stmts["old_balance"] + stmts["sum_income"] + stmts["sum_expenses"] == stmts["new_balance"]).all(), "statement does not add up"
+        assert (stmts["new_balance"][:-1] == stmts["old_balance"][1:]).all(), "statements don't chain"
+
+def main():
+    ap = ArgumentParser(description="compare amount field parsers and check that sliced archives reconcile to the cent")
+    ap.add_argument("--fields", type=int, default=200000, help="number of synthetic amount fields")
+    ap.add_argument("--years", type=int, default=50, help="number of years of synthetic statements for the reconciliation check")
+    ap.add_argument("--ranges", type=int, default=200, help="number of random date ranges for the reconciliation check")
+    args = ap.parse_args()
+
+    fields = synthetic_fields(args.fields)
+    assert all(parse_field_amount_regex(field) == parse_field_amount(field) for field in fields), "parsers disagree"
+
+    regex_time = timed(parse_field_amount_regex, fields)
+    cents_time = timed(parse_field_cents, fields)
+    amount_time = timed(parse_field_amount, fields)
+    print(f"regex float:     {regex_time / args.fields * 1e9:8.1f} ns per field")
+    print(f"replace cents:   {cents_time / args.fields * 1e9:8.1f} ns per field ({regex_time / cents_time:.1f}x)")
+    print(f"replace float:   {amount_time / args.fields * 1e9:8.1f} ns per field ({regex_time / amount_time:.1f}x)")
+
+    table = TransactionTable.from_statements(synthetic_statements(args.years * 12, 40))
+    check_reconciliation(table, args.ranges)
+    print(f"reconciled {args.ranges} date ranges over {len(table.lines)} lines to the cent")
+
+if __name__ == '__main__':
+    main()
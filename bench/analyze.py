@@ -0,0 +1,87 @@
+from argparse import ArgumentParser
+from datetime import timedelta
+from collections import deque
+import time
+import numpy as np
+
+from baestatement.stats import StatementStats, analyze
+from baestatement.table import TransactionTable
+from baestatement.synthetic import synthetic_statements
+
+def analyze_loop(table: TransactionTable, avg_period: int = 31, difference: bool = False) -> StatementStats:
+    # day by day reference implementation that analyze replaced
+    txns = table.transactions()
+    lines = list(zip(txns["value_date"].astype("datetime64[us]").tolist(), (txns["amount"] / 100).tolist()))
+
+    start_balance = table.statements["old_balance"][0] / 100
+    start_date = lines[0][0]
+    end_date = lines[-1][0]
+    num_days = (end_date - start_date).days + 1
+    dates = iter((i, start_date + timedelta(days=i)) for i in range(num_days))
+
+    stats = StatementStats(
+        datetime    = np.zeros(num_days, dtype='datetime64[h]'),
+        cur_balance = np.zeros(num_days, dtype='float64'),
+        avg_balance = np.zeros(num_days, dtype='float64'),
+        min_balance = np.zeros(num_days, dtype='float64'),
+        max_balance = np.zeros(num_days, dtype='float64'),
+    )
+
+    i, cur_date = next(dates)
+    cur_balance = start_balance
+    cur_difference = 0
+    last_balances: deque[float] = deque([cur_balance], maxlen = avg_period)
+    last_differences: deque[float] = deque([cur_difference], maxlen = avg_period)
+    def next_date():
+        nonlocal i, cur_date, cur_difference
+        last_balances.append(cur_balance)
+        cur_difference = cur_balance - last_balances[0]
+        last_differences.append(cur_difference)
+        stats.datetime[i] = cur_date
+        stats.cur_balance[i] = cur_difference if difference else cur_balance
+        stats.avg_balance[i] = np.average(last_differences if difference else last_balances)
+        stats.min_balance[i] = np.min(last_differences if difference else last_balances)
+        stats.max_balance[i] = np.max(last_differences if difference else last_balances)
+        i, cur_date = next(dates)
+
+    for value_date, amount in lines:
+        while cur_date < value_date:
+            next_date()
+        cur_balance += amount
+
+    try:
+        while True:
+            next_date()
+    except StopIteration:
+        pass
+
+    return stats
+
+def assert_stats_equal(a: StatementStats, b: StatementStats):
+    assert np.array_equal(a.datetime, b.datetime), "dates differ"
+    for name in ("cur_balance", "avg_balance", "min_balance", "max_balance"):
+        assert np.allclose(getattr(a, name), getattr(b, name), rtol=0, atol=1e-6), f"{name} differs"
+
+def main():
+    ap = ArgumentParser(description="compare vectorized and day by day balance statistics")
+    ap.add_argument("--years", type=int, default=20, help="number of years of synthetic statements")
+    ap.add_argument("--lines", type=int, default=40, help="number of lines per synthetic statement")
+    ap.add_argument("--avg-period", type=int, default=365, help="averaging period")
+    args = ap.parse_args()
+
+    table = TransactionTable.from_statements(synthetic_statements(args.years * 12, args.lines))
+
+    for difference in (False, True):
+        start = time.perf_counter()
+        expected = analyze_loop(table, args.avg_period, difference)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = analyze(table, args.avg_period, difference)
+        vector_time = time.perf_counter() - start
+
+        assert_stats_equal(expected, stats)
+        print(f"difference={difference!s:<5} days={len(stats.datetime)} loop: {loop_time * 1000:9.2f} ms vectorized: {vector_time * 1000:9.2f} ms")
+
+if __name__ == '__main__':
+    main()
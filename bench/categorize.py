@@ -0,0 +1,64 @@
+from argparse import ArgumentParser
+import random
+import time
+import numpy as np
+
+from baestatement.categorize import Categorizer, Rule, normalize_text
+from baestatement.stats import analyze_categories
+from baestatement.table import TransactionTable
+from baestatement.synthetic import synthetic_statements
+
+def synthetic_rules(num_rules: int, num_categories: int, seed: int = 0) -> list[Rule]:
+    # keywords overlap, e.g. "payee 1" is a prefix of "payee 12", so rule order matters
+    rng = random.Random(seed)
+    rules = [Rule(f"category {rng.randrange(num_categories)}", f"payee {i}") for i in range(200)]
+    rules += [Rule(f"category {rng.randrange(num_categories)}", f"reference {rng.randrange(100000)}") for _ in range(num_rules - len(rules))]
+    rng.shuffle(rules)
+    return rules
+
+def categorize_naive(rules: list[Rule], labels: list[str], text: str) -> int:
+    # reference implementation that tries every rule in turn
+    text = normalize_text(text)
+    for rule in rules:
+        if normalize_text(rule.keyword) in text:
+            return labels.index(rule.category)
+    return len(labels) - 1
+
+def main():
+    ap = ArgumentParser(description="measure rule-based categorization of synthetic transactions")
+    ap.add_argument("--years", type=int, default=10, help="number of years of synthetic statements")
+    ap.add_argument("--rules", type=int, default=5000, help="number of synthetic rules")
+    ap.add_argument("--categories", type=int, default=50, help="number of synthetic categories")
+    args = ap.parse_args()
+
+    table = TransactionTable.from_statements(synthetic_statements(args.years * 12, 40))
+    rules = synthetic_rules(args.rules, args.categories)
+
+    start = time.perf_counter()
+    categorizer = Categorizer(rules)
+    compiled = time.perf_counter()
+    categories = categorizer.categorize_table(table)
+    categorized = time.perf_counter()
+    stats = analyze_categories(table, categorizer)
+    analyzed = time.perf_counter()
+
+    print(f"compiled {len(rules)} rules in {(compiled - start) * 1000:.1f} ms")
+    print(f"categorized {len(table.lines)} lines ({len(table.texts)} distinct texts) in {(categorized - compiled) * 1000:.1f} ms")
+    print(f"analyzed {len(stats.labels)} categories in {(analyzed - categorized) * 1000:.1f} ms")
+
+    # a fresh categorizer has an empty text cache, like every new bae-analyze process
+    table.categorize(categorizer)
+    start = time.perf_counter()
+    saved = analyze_categories(table, Categorizer(rules))
+    print(f"analyzed with saved categories in {(time.perf_counter() - start) * 1000:.1f} ms, including compiling the rules")
+    assert saved.labels == stats.labels and np.array_equal(saved.avg_expenses, stats.avg_expenses), "saved categories differ"
+
+    sample = random.Random(0).sample(range(len(table.texts)), min(500, len(table.texts)))
+    start = time.perf_counter()
+    expected = [categorize_naive(rules, categorizer.labels, table.texts[i]) for i in sample]
+    naive = time.perf_counter() - start
+    assert expected == [categorizer.categorize(table.texts[i]) for i in sample], "categorizers disagree"
+    print(f"naive rule loop: {naive / len(sample) * len(table.texts) * 1000:.1f} ms estimated for all distinct texts")
+
+if __name__ == '__main__':
+    main()
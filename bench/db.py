@@ -0,0 +1,49 @@
+from argparse import ArgumentParser
+from datetime import datetime
+from contextlib import closing
+from pathlib import Path
+import tempfile
+import time
+import numpy as np
+
+from baestatement.db import connect_db, store_statements, load_db_table
+from baestatement.stats import analyze, take_date_range
+from baestatement.table import TransactionTable
+from baestatement.synthetic import synthetic_statements
+
+def main():
+    ap = ArgumentParser(description="measure storing and loading statements with the SQLite backend")
+    ap.add_argument("--years", type=int, default=20, help="number of years of synthetic statements")
+    args = ap.parse_args()
+
+    stmts = synthetic_statements(args.years * 12, 40)
+    table = TransactionTable.from_statements(stmts)
+    start_date, end_date = datetime(2010, 3, 15), datetime(2011, 6, 15)
+
+    with tempfile.TemporaryDirectory() as tmp, closing(connect_db(Path(tmp) / "archive.db")) as conn:
+        start = time.perf_counter()
+        store_statements(conn, stmts)
+        stored = time.perf_counter()
+        store_statements(conn, stmts)
+        restored = time.perf_counter()
+        print(f"stored {len(stmts)} statements in {(stored - start) * 1000:.1f} ms, again in {(restored - stored) * 1000:.1f} ms")
+        assert conn.execute("SELECT count(*) FROM lines").fetchone()[0] == len(table.lines), "upsert duplicated lines"
+
+        start = time.perf_counter()
+        full = load_db_table(conn)
+        loaded = time.perf_counter()
+        ranged = load_db_table(conn, start_date, end_date)
+        pushed = time.perf_counter()
+        print(f"loaded all {len(full)} statements in {(loaded - start) * 1000:.1f} ms")
+        print(f"loaded {len(ranged)} statements of a date range in {(pushed - loaded) * 1000:.1f} ms")
+
+    # the database round trip and the date range pushdown must not change any results
+    # NaT never compares equal, so the tables are compared byte for byte
+    assert full.statements.tobytes() == table.statements.tobytes() and full.lines.tobytes() == table.lines.tobytes(), "tables differ"
+    expected = analyze(take_date_range(table, start_date, end_date)[0])
+    actual = analyze(take_date_range(ranged, start_date, end_date)[0])
+    assert all(np.array_equal(getattr(expected, name), getattr(actual, name)) for name in ("datetime", "cur_balance", "min_balance", "max_balance")), "analysis differs"
+    print("date range pushdown matches the full table")
+
+if __name__ == '__main__':
+    main()
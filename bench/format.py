@@ -0,0 +1,72 @@
+from argparse import ArgumentParser
+import tracemalloc
+import time
+import os
+
+from baestatement.parse import Statement
+from baestatement.format import iter_cli, iter_dump
+from baestatement.format.dump import dump_line, dump_summary
+from baestatement.format.util import fmt_amount, fmt_date, fmt_date_noyear
+from baestatement.synthetic import synthetic_statements
+
+def format_cli_concat(stmt: Statement) -> str:
+    # string concatenation reference implementation that iter_cli replaced
+    formatted = ""
+    for line in stmt.lines:
+        text_lines = str(line.text).split("\n")
+        for i, text_line in enumerate(text_lines):
+            begin_marker, end_marker = "   " + fmt_date_noyear(None), ""
+            if i == 0:
+                begin_marker = ">> " + fmt_date_noyear(line.booking_date)
+            if i == len(text_lines) - 1:
+                end_marker = fmt_date_noyear(line.value_date) + " " + fmt_amount(line.amount)
+
+            formatted += f"{begin_marker} {text_line:<57} {end_marker}\n"
+
+    formatted += f">> date:         {fmt_date(stmt.summary.date)}\n"
+    return formatted.rstrip("\n")
+
+def dump_concat(stmt: Statement) -> str:
+    formatted = "Statement(\n    lines=[\n"
+    for line in stmt.lines:
+        formatted += dump_line(line)
+
+    formatted += "    ],\n"
+    formatted += dump_summary(stmt.summary)
+    formatted += ")"
+    return formatted
+
+def measure(f, stmt: Statement) -> tuple[float, int]:
+    # time and memory are measured in separate runs, tracing allocations slows formatting down
+    start = time.perf_counter()
+    f(stmt)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    f(stmt)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    ap = ArgumentParser(description="measure formatter scaling on a single synthetic statement with many lines")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[5000, 10000, 20000, 40000, 80000], help="number of lines per statement")
+    args = ap.parse_args()
+
+    with open(os.devnull, "w") as devnull:
+        formatters = {
+            "cli concat": lambda stmt: print(format_cli_concat(stmt), file=devnull),
+            "cli stream": lambda stmt: devnull.writelines(iter_cli(stmt)),
+            "dump concat": lambda stmt: print(dump_concat(stmt), file=devnull),
+            "dump stream": lambda stmt: devnull.writelines(iter_dump(stmt)),
+        }
+
+        print(f"{'formatter':<12} {'lines':>7} {'time':>10} {'per line':>10} {'peak memory':>12}")
+        for name, f in formatters.items():
+            for size in args.sizes:
+                stmt, = synthetic_statements(1, size)
+                elapsed, peak = measure(f, stmt)
+                print(f"{name:<12} {size:>7} {elapsed * 1000:7.2f} ms {elapsed / size * 1e6:7.2f} us {peak / 2**20:8.2f} MiB")
+
+if __name__ == '__main__':
+    main()
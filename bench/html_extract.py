@@ -0,0 +1,81 @@
+from argparse import ArgumentParser
+from subprocess import check_call, DEVNULL
+from tempfile import TemporaryDirectory
+from pathlib import Path
+from io import StringIO
+import random
+import time
+
+from bs4 import BeautifulSoup
+from baestatement.pdf import extract_pdf_pages, extract_page_fields, iter_html_page_fields, PageFields
+
+def synthetic_html(num_pages: int, fields_per_page: int, seed: int = 0, images: bool = True) -> str:
+    rng = random.Random(seed)
+    image = "data:image/png;base64," + "A" * 64 * 1024
+
+    html = StringIO()
+    html.write("<!DOCTYPE html><html>\n<head><title>bench</title></head>\n<body bgcolor=\"#A0A0A0\" vlink=\"blue\" link=\"blue\">\n")
+    for page in range(1, num_pages + 1):
+        html.write(f"<!-- Page {page} -->\n<a name=\"{page}\"></a>\n")
+        html.write(f"<div id=\"page{page}-div\" style=\"position:relative;width:1782px;height:864px;\">\n")
+        if images:
+            html.write(f"<img width=\"1782\" height=\"864\" src=\"{image}\" alt=\"background image\"/>\n")
+        for _ in range(fields_per_page):
+            top, left = rng.randrange(864), rng.randrange(1782)
+            text = rng.choice(["03.01", "1.234,56-", "Überweisung&#160;an&#160;Max", "<b>Saldo</b>&amp;Co", "A<br/>B"])
+            html.write(f"<p style=\"position:absolute;top:{top}px;left:{left}px;white-space:nowrap\" class=\"ft00\">{text}</p>\n")
+        html.write("</div>\n")
+    html.write("</body>\n</html>\n")
+    return html.getvalue()
+
+def pdf_html(pdf: Path) -> str:
+    with TemporaryDirectory(prefix="baestatement.") as tmpdir:
+        html = Path(tmpdir) / "index.html"
+        check_call(["pdftohtml", "-s", "-noframes", "-dataurls", pdf, html.with_suffix("")], stdout=DEVNULL)
+        return html.read_text()
+
+def extract_soup(html: str, precision: int) -> list[PageFields]:
+    soup = BeautifulSoup(html, "html.parser")
+    return [extract_page_fields(page, precision) for page in extract_pdf_pages(soup)]
+
+def extract_stream(html: str, precision: int) -> list[PageFields]:
+    return list(iter_html_page_fields(StringIO(html), precision))
+
+def timeit(f, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    ap = ArgumentParser(description="compare BeautifulSoup and streaming page field extraction")
+    ap.add_argument("-n", "--repeat", type=int, default=5, help="number of timing repetitions")
+    ap.add_argument("-p", "--precision", type=int, default=4, help="number of digits of coordinate precision")
+    ap.add_argument("--pages", type=int, default=20, help="number of synthetic pages")
+    ap.add_argument("--fields", type=int, default=200, help="number of synthetic fields per page")
+    ap.add_argument("path", type=Path, nargs="?", help="pdftohtml output or PDF file (default: synthetic html)")
+    args = ap.parse_args()
+
+    if args.path is None:
+        html = synthetic_html(args.pages, args.fields)
+    elif args.path.suffix == ".pdf":
+        html = pdf_html(args.path)
+    else:
+        html = args.path.read_text()
+
+    soup_pages = extract_soup(html, args.precision)
+    stream_pages = extract_stream(html, args.precision)
+    assert soup_pages == stream_pages, "streaming extractor produced different page fields"
+    assert all(list(a) == list(b) for a, b in zip(soup_pages, stream_pages)), "streaming extractor produced different field order"
+
+    soup_time = timeit(lambda: extract_soup(html, args.precision), args.repeat)
+    stream_time = timeit(lambda: extract_stream(html, args.precision), args.repeat)
+
+    print(f"input:  {len(html)} chars, {len(soup_pages)} pages, {sum(len(page) for page in soup_pages)} fields")
+    print(f"soup:   {soup_time * 1000:9.2f} ms")
+    print(f"stream: {stream_time * 1000:9.2f} ms ({soup_time / stream_time:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+from argparse import ArgumentParser
+from subprocess import check_output
+from typing import Optional
+from pathlib import Path
+from io import StringIO
+import time
+
+from baestatement.pdf import pdftohtml_image_args, iter_html_page_fields
+from baestatement.cli.util import find_statement_files
+from html_extract import synthetic_html
+
+def pdf_html(pdf: Path, images: bool) -> tuple[str, float]:
+    start = time.perf_counter()
+    html = check_output(["pdftohtml", "-s", "-noframes", *pdftohtml_image_args(images), "-q", "-stdout", pdf], text=True)
+    return html, time.perf_counter() - start
+
+def parse_html(html: str, precision: int) -> float:
+    start = time.perf_counter()
+    pages = list(iter_html_page_fields(StringIO(html), precision))
+    assert len(pages) > 0, "no pages found in html"
+    return time.perf_counter() - start
+
+def report(name: str, with_images: tuple[str, Optional[float]], without_images: tuple[str, Optional[float]], precision: int):
+    for label, (html, convert_time) in (("images", with_images), ("no images", without_images)):
+        parse_time = parse_html(html, precision)
+        size = len(html.encode())
+        convert = "n/a" if convert_time is None else f"{convert_time * 1000:.2f}"
+        print(f"{name:<32} {label:<10} {size:>12} bytes {convert:>9} ms convert {parse_time * 1000:9.2f} ms parse")
+
+def main():
+    ap = ArgumentParser(description="measure html size and parse time with and without embedded images")
+    ap.add_argument("-p", "--precision", type=int, default=4, help="number of digits of coordinate precision")
+    ap.add_argument("path", type=Path, nargs="?", help="PDF file or folder with PDF files (default: synthetic html)")
+    args = ap.parse_args()
+
+    if args.path is None:
+        report("synthetic", (synthetic_html(20, 200, images=True), None), (synthetic_html(20, 200, images=False), None), args.precision)
+        return
+
+    for pdf in find_statement_files(args.path):
+        if pdf.suffix != ".pdf":
+            continue
+
+        report(pdf.name, pdf_html(pdf, images=True), pdf_html(pdf, images=False), args.precision)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from subprocess import run
+from pathlib import Path
+import sys
+import os
+
+from baestatement.format import format_json
+from baestatement.synthetic import synthetic_statements
+
+# modules that --help and JSON-only invocations must never import
+HEAVY_MODULES: tuple[str, ...] = ("numpy", "bs4", "matplotlib")
+
+# target total import time in ms per (entry point, invocation), importing
+# numpy alone takes about 90 ms and bs4 about 65 ms on the same machine
+TARGETS: dict[tuple[str, str], float] = {
+    ("bae-dump", "--help"): 100,
+    ("bae-show", "--help"): 100,
+    ("bae-analyze", "--help"): 100,
+    ("bae-csv", "--help"): 100,
+    ("bae-json", "--help"): 100,
+    ("bae-plot", "--help"): 100,
+    ("bae-plot-period", "--help"): 100,
+    ("bae-rename", "--help"): 100,
+    ("bae-table", "--help"): 100,
+    ("bae-sync", "--help"): 100,
+    ("bae-daemon", "--help"): 140,
+    ("bae-show", "json"): 100,
+    ("bae-csv", "json"): 100,
+    ("bae-json", "json"): 100,
+    ("bae-dump", "json"): 100,
+    ("bae-rename", "json"): 100,
+}
+
+ENTRY_POINTS: dict[str, str] = {
+    "bae-dump": "dump",
+    "bae-show": "show",
+    "bae-analyze": "analyze",
+    "bae-csv": "csv",
+    "bae-json": "json",
+    "bae-plot": "plot",
+    "bae-plot-period": "plot_period",
+    "bae-rename": "rename",
+    "bae-table": "table",
+    "bae-sync": "sync",
+    "bae-daemon": "daemon",
+}
+
+def measure(entry_point: str, argv: list[str]) -> tuple[float, set[str]]:
+    # run the entry point with -X importtime and sum up the cumulative time of top level imports
+    code = f"import sys; sys.argv = {[entry_point, *argv]!r}; from baestatement.cli.{ENTRY_POINTS[entry_point]} import main; main()"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    proc = run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env)
+
+    total_us = 0
+    modules: set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        _self, cumulative, name = line.removeprefix("import time:").split("|", 2)
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+        modules.add(name.strip().split(".")[0])
+
+    return total_us / 1000, modules
+
+def main():
+    ap = ArgumentParser(description="measure import time of entry points for --help and JSON-only invocations")
+    ap.add_argument("-n", "--repeat", type=int, default=5, help="number of runs per invocation, the fastest run is reported")
+    args = ap.parse_args()
+
+    failed = False
+    with TemporaryDirectory(prefix="baestatement.") as tmpdir:
+        # JSON-only invocations run on a single synthetic statement, rename runs on a copy of it
+        stmt, = synthetic_statements(1, 40)
+        json_file = Path(tmpdir) / f"estatement-{stmt.summary.date:%Y-%m-%d}.json"
+        json_file.write_text(format_json(stmt))
+
+        for (entry_point, invocation), target in TARGETS.items():
+            if invocation == "--help":
+                argv = ["--help"]
+            elif entry_point == "bae-rename":
+                argv = ["--no-daemon", "-j", "1", tmpdir]
+            else:
+                argv = ["--no-daemon", "-j", "1", str(json_file)]
+
+            results = [measure(entry_point, argv) for _ in range(args.repeat)]
+            total = min(total for total, _modules in results)
+            heavy = sorted(set(HEAVY_MODULES) & set.union(*(modules for _total, modules in results)))
+
+            ok = total <= target and not heavy
+            failed |= not ok
+            status = "ok" if ok else "FAIL"
+            print(f"{entry_point:<16} {invocation:<7} {total:8.2f} ms (target {target:5.0f} ms) {status:<4} {' '.join(heavy)}")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
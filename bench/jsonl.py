@@ -0,0 +1,75 @@
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import time
+
+from baestatement.format import format_json
+from baestatement.format import util
+from baestatement.format.jsonl import dump_jsonl, load_jsonl, load_jsonl_table
+from baestatement.table import TransactionTable
+from baestatement.cli.util import find_statement_files, parse_statement_from_json
+from baestatement.synthetic import synthetic_statements
+
+def timed(f, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = f()
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+def dump_file(stmts: list, path: Path):
+    with open(path, "wb") as f:
+        dump_jsonl(stmts, f)
+
+def load_file(path: Path) -> list:
+    with open(path, "rb") as f:
+        return load_jsonl(f)
+
+def load_file_table(path: Path) -> TransactionTable:
+    with open(path, "rb") as f:
+        return load_jsonl_table(f)
+
+def main():
+    ap = ArgumentParser(description="compare per-file JSON statements with a single JSON Lines archive")
+    ap.add_argument("--statements", type=int, default=2000, help="number of synthetic statements")
+    ap.add_argument("--lines", type=int, default=40, help="number of lines per synthetic statement")
+    ap.add_argument("-n", "--repeat", type=int, default=3, help="number of runs, the fastest run is reported")
+    args = ap.parse_args()
+
+    stmts = synthetic_statements(args.statements, args.lines)
+    with TemporaryDirectory(prefix="baestatement.") as tmpdir:
+        for i, stmt in enumerate(stmts):
+            (Path(tmpdir) / f"estatement-{i:05}.json").write_text(format_json(stmt))
+
+        files = find_statement_files(Path(tmpdir))
+        per_file_size = sum(file.stat().st_size for file in files)
+        per_file_time, per_file = timed(lambda: [parse_statement_from_json(file) for file in files], args.repeat)
+
+        archive = Path(tmpdir) / "archive.jsonl"
+        dump_time, _ = timed(lambda: dump_file(stmts, archive), args.repeat)
+        archive_size = archive.stat().st_size
+        archive_time, loaded = timed(lambda: load_file(archive), args.repeat)
+        per_file_table_time, _ = timed(lambda: TransactionTable.from_statements([parse_statement_from_json(file) for file in files]), args.repeat)
+        table_time, _ = timed(lambda: load_file_table(archive), args.repeat)
+
+        # force the stdlib fallback to see what the optional decoder is worth
+        fast = util.orjson
+        util.orjson = None
+        stdlib_time, _ = timed(lambda: load_file(archive), args.repeat)
+        util.orjson = fast
+
+    assert loaded == stmts, "archive does not round trip"
+    assert [stmt.lines for stmt in per_file] == [stmt.lines for stmt in stmts], "per-file json does not round trip"
+
+    print(f"statements: {args.statements} x {args.lines} lines")
+    print(f"per-file json:  {per_file_time * 1000:9.2f} ms load, {per_file_size:>10} bytes")
+    print(f"jsonl archive:  {archive_time * 1000:9.2f} ms load, {archive_size:>10} bytes ({per_file_time / archive_time:.1f}x, {'orjson' if fast else 'stdlib'})")
+    print(f"jsonl stdlib:   {stdlib_time * 1000:9.2f} ms load")
+    print(f"jsonl dump:     {dump_time * 1000:9.2f} ms")
+    print(f"per-file table: {per_file_table_time * 1000:9.2f} ms load")
+    print(f"jsonl table:    {table_time * 1000:9.2f} ms load ({per_file_table_time / table_time:.1f}x)")
+
+if __name__ == '__main__':
+    main()
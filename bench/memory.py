@@ -0,0 +1,80 @@
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Callable, Optional
+from io import BytesIO
+import tracemalloc
+
+from baestatement.parse import Statement, StatementLine, StatementSummary
+from baestatement.record import StatementRecord, StatementLineRecord, StatementSummaryRecord
+from baestatement.format.jsonl import dump_jsonl, parse_jsonl_compact
+from baestatement.synthetic import synthetic_statements
+
+# reference copies of the statement classes before they were slotted
+@dataclass
+class DictStatementLine:
+    text: str
+    amount: Optional[float] = None
+    booking_date: Optional[datetime] = None
+    value_date: Optional[datetime] = None
+
+@dataclass
+class DictStatementSummary:
+    date: datetime
+    sum_expenses: float
+    sum_income: float
+    old_balance: float
+    new_balance: float
+    closing_date: Optional[datetime] = None
+    closing_balance: Optional[float] = None
+
+@dataclass
+class DictStatement:
+    lines: list[DictStatementLine]
+    summary: DictStatementSummary
+    layout: Optional[str] = None
+
+def build(obj: list, line_cls: type, summary_cls: type, stmt_cls: type, to_date: Callable, to_amount: Callable, seq: type):
+    stmt_date, sum_expenses, sum_income, old_balance, new_balance, closing_date, closing_balance, layout, lines = obj
+    opt_date = lambda ordinal: None if ordinal is None else to_date(ordinal)
+    opt_amount = lambda cents: None if cents is None else to_amount(cents)
+    return stmt_cls(
+        seq(line_cls(text, opt_amount(amount), opt_date(booking_date), opt_date(value_date)) for text, amount, booking_date, value_date in lines),
+        summary_cls(
+            to_date(stmt_date), to_amount(sum_expenses), to_amount(sum_income), to_amount(old_balance), to_amount(new_balance),
+            opt_date(closing_date), opt_amount(closing_balance),
+        ),
+        layout,
+    )
+
+VARIANTS: dict[str, tuple] = {
+    "dataclass": (DictStatementLine, DictStatementSummary, DictStatement, datetime.fromordinal, lambda cents: cents / 100, list),
+    "slotted": (StatementLine, StatementSummary, Statement, datetime.fromordinal, lambda cents: cents / 100, list),
+    "record": (StatementLineRecord, StatementSummaryRecord, StatementRecord, date.fromordinal, lambda cents: cents, tuple),
+}
+
+def main():
+    ap = ArgumentParser(description="measure the in-memory footprint of statement representations")
+    ap.add_argument("--statements", type=int, default=2000, help="number of synthetic statements")
+    ap.add_argument("--lines", type=int, default=40, help="number of lines per synthetic statement")
+    args = ap.parse_args()
+
+    # every variant is built from the same decoded primitives, so line texts are
+    # shared and only the per-line objects, dates and amounts are counted
+    f = BytesIO()
+    dump_jsonl(synthetic_statements(args.statements, args.lines), f)
+    objs = parse_jsonl_compact(f.getvalue())
+    num_lines = sum(len(obj[8]) for obj in objs)
+
+    print(f"statements: {args.statements}, lines: {num_lines}")
+    for name, variant in VARIANTS.items():
+        tracemalloc.start()
+        stmts = [build(obj, *variant) for obj in objs]
+        size, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{name:<10} {size / 2**20:8.2f} MiB {size / num_lines:8.1f} bytes per line")
+        del stmts
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+from argparse import ArgumentParser
+from datetime import datetime
+from typing import Iterator
+from pathlib import Path
+import tempfile
+import tracemalloc
+import time
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from baestatement.parse import Statement
+from baestatement.format.parquet import latest_parquet_statement, write_parquet
+from baestatement.synthetic import synthetic_statements
+
+def yearly_statements(years: int) -> Iterator[Statement]:
+    # generated a year at a time, like statements streamed from a parser
+    for year in range(years):
+        yield from synthetic_statements(12, 40, seed=year, start_date=datetime(2000 + year, 1, 1))
+
+def main():
+    ap = ArgumentParser(description="measure streaming parquet export of synthetic statements")
+    ap.add_argument("--years", type=int, nargs="+", default=[5, 10, 20], help="numbers of years of synthetic statements")
+    args = ap.parse_args()
+
+    for years in args.years:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp)
+            pool = pa.default_memory_pool()
+            pool.release_unused()
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            count = write_parquet(yearly_statements(years), path)
+            elapsed = time.perf_counter() - start
+            _size, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            # appending the same statements again writes nothing
+            assert write_parquet(yearly_statements(years), path, latest_parquet_statement(path)) == 0, "append rewrote statements"
+
+            rows = ds.dataset(path, partitioning="hive").count_rows()
+            print(f"{years:3} years {count:5} statements {rows:7} lines {elapsed * 1000:8.1f} ms, peak python memory {peak / 2**20:6.2f} MiB, peak arrow memory {pool.max_memory() / 2**20:6.2f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+from argparse import ArgumentParser
+from datetime import datetime
+import pickle
+import time
+
+from baestatement.search import SearchQuery, build_search_index, tokenize
+from baestatement.synthetic import synthetic_statements
+
+QUERIES: dict[str, SearchQuery] = {
+    "term": SearchQuery(terms=["payee", "17"]),
+    "prefix": SearchQuery(prefixes=["reference", "123"]),
+    "amount range": SearchQuery(min_amount=-10000, max_amount=-5000),
+    "date range": SearchQuery(start_date=datetime(2010, 1, 1), end_date=datetime(2010, 12, 31)),
+    "combined": SearchQuery(terms=["payee", "17"], min_amount=-50000, max_amount=0, start_date=datetime(2008, 1, 1)),
+}
+
+def timed(f, repeat: int) -> tuple[float, object]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = f()
+    return (time.perf_counter() - start) / repeat, result
+
+def main():
+    ap = ArgumentParser(description="measure inverted index queries over a synthetic archive")
+    ap.add_argument("--years", type=int, default=10, help="number of years of synthetic statements")
+    ap.add_argument("--repeat", type=int, default=20, help="number of repetitions per query")
+    args = ap.parse_args()
+
+    stmts = { f"statement-{i:04}.json": stmt for i, stmt in enumerate(synthetic_statements(args.years * 12, 40)) }
+    lines = [(stmt.summary.date, line) for stmt in stmts.values() for line in stmt.lines]
+
+    elapsed, index = timed(lambda: build_search_index(stmts), 1)
+    data = pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"indexed {len(lines)} lines in {elapsed * 1000:.1f} ms ({len(data) / 2**20:.2f} MiB)")
+
+    elapsed, _ = timed(lambda: pickle.loads(data), args.repeat)
+    print(f"{'load':<14} {elapsed * 1000:8.2f} ms")
+
+    name, stmt = next(iter(stmts.items()))
+    elapsed, _ = timed(lambda: index.update(name, stmt), args.repeat)
+    print(f"{'update':<14} {elapsed * 1000:8.2f} ms per statement")
+
+    for label, query in QUERIES.items():
+        elapsed, hits = timed(lambda: index.search(query), args.repeat)
+        print(f"{label:<14} {elapsed * 1000:8.2f} ms {len(hits):6} hits")
+
+    # reference scan over the rendered texts, like grepping bae-show output
+    query = QUERIES["term"]
+    elapsed, matches = timed(lambda: [line for _date, line in lines if all(term in tokenize(line.text) for term in query.terms)], 1)
+    assert len(matches) == len(index.search(query)), "index and scan disagree"
+    print(f"{'term scan':<14} {elapsed * 1000:8.2f} ms {len(matches):6} hits")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+from argparse import ArgumentParser
+import time
+
+from baestatement.table import TransactionTable
+from baestatement.verify import verify_table
+from baestatement.synthetic import synthetic_statements
+
+def main():
+    ap = ArgumentParser(description="measure archive verification on synthetic statements")
+    ap.add_argument("--statements", type=int, default=5000, help="number of synthetic statements")
+    ap.add_argument("--lines", type=int, default=40, help="number of lines per synthetic statement")
+    args = ap.parse_args()
+
+    stmts = synthetic_statements(args.statements, args.lines)
+    table = TransactionTable.from_statements(stmts)
+
+    start = time.perf_counter()
+    issues = verify_table(table)
+    elapsed = time.perf_counter() - start
+    assert issues == [], "synthetic statements don't verify"
+    print(f"verified {args.statements} statements with {len(table.lines)} lines in {elapsed * 1000:.2f} ms")
+
+    # every broken statement is reported, dropping one leaves a gap in the balances
+    del stmts[args.statements // 2]
+    issues = verify_table(TransactionTable.from_statements(stmts))
+    assert [issue.kind for issue in issues] == ["gap"], "missing statement not detected"
+
+if __name__ == '__main__':
+    main()